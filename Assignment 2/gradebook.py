@@ -2,7 +2,240 @@
 # Roll no= 2501730184
 # Assignment 2: Gradebook Analyzer
 import csv
+import hashlib
+import json
 import os
+
+import numpy as np
+
+# Grade boundaries: a score >= GRADE_BOUNDARIES[i] earns at least GRADE_LETTERS[i + 1]
+GRADE_BOUNDARIES = (60, 70, 80, 90)
+GRADE_LETTERS = ("F", "D", "C", "B", "A")
+PASS_MARK = 40
+
+
+class GradeEngine:
+    """Array-backed gradebook: names and float64 scores, graded with searchsorted.
+
+    All statistics come from one vectorized pass over the score array and
+    are cached, so the report functions below can share one engine.
+    """
+
+    def __init__(self, names, scores, boundaries=GRADE_BOUNDARIES, letters=GRADE_LETTERS,
+                 pass_mark=PASS_MARK):
+        self.names = np.asarray(names, dtype=object)
+        self.scores = np.asarray(scores, dtype=np.float64)
+        self.boundaries = np.asarray(boundaries, dtype=np.float64)
+        self.letters = np.asarray(letters)
+        if len(self.letters) != len(self.boundaries) + 1:
+            raise ValueError("need exactly one more grade letter than boundaries")
+        if np.any(np.diff(self.boundaries) <= 0):
+            raise ValueError("grade boundaries must be strictly increasing")
+        if self.names.shape != self.scores.shape:
+            raise ValueError("names and scores must have the same length")
+        self.pass_mark = pass_mark
+        self._grade_index = None
+        self._stats = None
+
+    @classmethod
+    def from_dict(cls, marks, **options):
+        return cls(list(marks), np.fromiter(marks.values(), dtype=np.float64, count=len(marks)), **options)
+
+    @classmethod
+    def from_csv(cls, filename, **options):
+        """Every valid Name,Marks row (duplicate names are kept as separate rows)."""
+        with open(filename, 'r', newline='') as file:
+            reader = csv.reader(file)
+            next(reader, None)
+            names, scores = _parse_rows(reader)
+        return cls(names, scores, **options)
+
+    def __len__(self):
+        return self.scores.size
+
+    @property
+    def grade_index(self):
+        if self._grade_index is None:
+            # side='right': a score equal to a boundary gets the higher grade
+            self._grade_index = np.searchsorted(self.boundaries, self.scores, side='right')
+        return self._grade_index
+
+    def grade_letters(self):
+        return self.letters[self.grade_index]
+
+    def grades(self):
+        return dict(zip(self.names.tolist(), self.grade_letters().tolist()))
+
+    def stats(self):
+        if self._stats is None:
+            scores, n = self.scores, self.scores.size
+            counts = np.bincount(self.grade_index, minlength=len(self.letters))
+            # cumsum adds left to right like the old sum(); mean() sums pairwise and can round differently
+            stats = {"count": n, "average": float(np.cumsum(scores)[-1]) / n if n else 0.0,
+                     "distribution": dict(zip(self.letters[::-1].tolist(), counts[::-1].tolist())),
+                     "passed": int(np.count_nonzero(scores >= self.pass_mark))}
+            stats["failed"] = n - stats["passed"]
+            if n:
+                i_max, i_min = int(scores.argmax()), int(scores.argmin())   # first occurrence, like the loops did
+                stats.update(max=float(scores[i_max]), max_student=self.names[i_max],
+                             min=float(scores[i_min]), min_student=self.names[i_min])
+            self._stats = stats
+        return self._stats
+
+
+def _engine(student_scores):
+    if isinstance(student_scores, GradeEngine):
+        return student_scores
+    return GradeEngine.from_dict(student_scores)
+
+def _parse_rows(rows):
+    """Names and a float64 score array from Name,Marks rows, skipping malformed ones."""
+    names, scores = [], []
+    for row in rows:
+        if len(row) >= 2:
+            try:
+                score = float(row[1])
+            except ValueError:
+                continue
+            names.append(row[0].strip())
+            scores.append(score)
+    return names, np.array(scores, dtype=np.float64)
+
+
+# Streaming statistics for gradebooks too large to hold in memory
+class RunningStats:
+    """Count, mean/variance (Welford), min/max and grade histogram over every row seen.
+
+    Whole chunks are merged with the parallel form of Welford's update, so
+    the file is never held in memory and a single new row costs O(1).
+    """
+
+    def __init__(self, boundaries=GRADE_BOUNDARIES, letters=GRADE_LETTERS, pass_mark=PASS_MARK):
+        self.boundaries = tuple(float(b) for b in boundaries)
+        self.letters = tuple(letters)
+        self.pass_mark = float(pass_mark)
+        self.count, self.mean, self.m2, self.passed = 0, 0.0, 0.0, 0
+        self.min = self.max = None
+        self.min_student = self.max_student = None
+        self.histogram = [0] * len(self.letters)
+
+    def add_chunk(self, names, scores):
+        n = scores.size
+        if not n:
+            return
+        chunk_mean = float(scores.mean())
+        chunk_m2 = float(((scores - chunk_mean) ** 2).sum())
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += chunk_m2 + delta * delta * self.count * n / total
+        self.count = total
+
+        i_max, i_min = int(scores.argmax()), int(scores.argmin())
+        if self.max is None or scores[i_max] > self.max:   # strict: first occurrence wins
+            self.max, self.max_student = float(scores[i_max]), names[i_max]
+        if self.min is None or scores[i_min] < self.min:
+            self.min, self.min_student = float(scores[i_min]), names[i_min]
+
+        grade_index = np.searchsorted(self.boundaries, scores, side='right')
+        counts = np.bincount(grade_index, minlength=len(self.letters))
+        self.histogram = [a + b for a, b in zip(self.histogram, counts.tolist())]
+        self.passed += int(np.count_nonzero(scores >= self.pass_mark))
+
+    def stats(self):
+        """Same keys as GradeEngine.stats(), plus the standard deviation."""
+        stats = {"count": self.count, "average": self.mean if self.count else 0.0,
+                 "std": (self.m2 / (self.count - 1)) ** 0.5 if self.count > 1 else 0.0,
+                 "distribution": dict(zip(self.letters[::-1], self.histogram[::-1])),
+                 "passed": self.passed, "failed": self.count - self.passed}
+        if self.count:
+            stats.update(max=self.max, max_student=self.max_student,
+                         min=self.min, min_student=self.min_student)
+        return stats
+
+    def same_grading(self, other):
+        return (self.boundaries, self.letters, self.pass_mark) == (other.boundaries, other.letters, other.pass_mark)
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls(data["boundaries"], data["letters"], data["pass_mark"])
+        for key in ("count", "mean", "m2", "passed", "min", "max", "min_student", "max_student", "histogram"):
+            setattr(stats, key, data[key])
+        return stats
+
+
+def _iter_row_chunks(filename, start=0, block_size=8 << 20):
+    """Yield (rows, end_offset) from byte `start` on, reading block_size bytes at a time.
+
+    Blocks are cut at the last newline so every chunk ends on a row boundary
+    and end_offset is exactly how far the file has been consumed.
+    """
+    with open(filename, 'rb') as file:
+        file.seek(start)
+        offset, pending = start, b''
+        while True:
+            block = file.read(block_size)
+            if not block:
+                break
+            block = pending + block
+            cut = block.rfind(b'\n') + 1
+            pending = block[cut:]
+            if cut:
+                offset += cut
+                yield list(csv.reader(block[:cut].decode('utf-8', errors='replace').splitlines())), offset
+        if pending:   # last row without a trailing newline
+            yield list(csv.reader(pending.decode('utf-8', errors='replace').splitlines())), offset + len(pending)
+
+
+def _summary_path(filename):
+    return filename + ".summary.json"
+
+def _fingerprint(filename, size):
+    """Hash of the first 4 KB and the 64 bytes before `size` - cheap check that the file was only appended to."""
+    with open(filename, 'rb') as file:
+        head = file.read(min(size, 4096))
+        file.seek(max(0, size - 64))
+        tail = file.read(min(size, 64))
+    return hashlib.blake2b(head + tail, digest_size=16).hexdigest()
+
+def summarize_csv(filename, boundaries=GRADE_BOUNDARIES, letters=GRADE_LETTERS, pass_mark=PASS_MARK,
+                  use_sidecar=True):
+    """Streamed statistics for every valid row of a Name,Marks CSV (duplicate names included).
+
+    A <csv>.summary.json sidecar remembers the statistics and how many
+    bytes they cover. If the CSV has only grown since, just the new tail
+    is read, so summarizing after appending one student is O(1).
+    """
+    size = os.path.getsize(filename)
+    stats, start = RunningStats(boundaries, letters, pass_mark), 0
+    sidecar = _summary_path(filename)
+    if use_sidecar and os.path.exists(sidecar):
+        try:
+            with open(sidecar) as file:
+                saved = json.load(file)
+            cached = RunningStats.from_dict(saved["stats"])
+            if (cached.same_grading(stats) and saved["size"] <= size
+                    and saved["fingerprint"] == _fingerprint(filename, saved["size"])):
+                stats, start = cached, saved["size"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass   # unreadable or stale sidecar: rebuild it from scratch
+
+    end, skip_header = start, start == 0
+    for rows, end in _iter_row_chunks(filename, start):
+        if skip_header and rows:
+            rows, skip_header = rows[1:], False
+        stats.add_chunk(*_parse_rows(rows))
+
+    if use_sidecar and (end != start or not os.path.exists(sidecar)):
+        tmp = sidecar + ".tmp"
+        with open(tmp, 'w') as file:
+            json.dump({"size": end, "fingerprint": _fingerprint(filename, end), "stats": stats.to_dict()}, file)
+        os.replace(tmp, sidecar)
+    return stats
+
 def get_manual_input():
     marks = {}
     print("\n--- Manual Data Entry ---")
@@ -33,6 +266,7 @@ def load_csv_data(filename):
         with open(filename, 'r') as file:
             reader = csv.reader(file)
             next(reader, None)
+            rows = 0
             
             for row in reader:
                 if len(row) >= 2:
@@ -40,10 +274,13 @@ def load_csv_data(filename):
                     try:
                         score = float(row[1].strip())
                         marks[name] = score
+                        rows += 1
                     except ValueError:
                         continue
         
-        print(f"Loaded {len(marks)} students from {filename}.")
+        duplicates = rows - len(marks)
+        print(f"Loaded {len(marks)} students from {filename}."
+              + (f" ({duplicates} repeated names kept their last score)" if duplicates else ""))
         
     except Exception as e:
         print(f"An error occurred: {e}")
@@ -73,85 +310,56 @@ def append_student_record(filename):
         writer.writerow([name, score])
         
     print(f"Added {name} to {filename}.")
+    return name, score
 
+# The functions below accept a {name: score} dict or a GradeEngine.
 def calculate_average(marks_dict):
-    scores = list(marks_dict.values())
-    if not scores:
-        return 0.0
-    return sum(scores) / len(scores)
+    return _engine(marks_dict).stats()["average"]
 
 def find_max_score(student_scores):
-    if not student_scores:
+    stats = _engine(student_scores).stats()
+    if not stats["count"]:
         return
-        
-    max_score = -1
-    max_student = ""
-
-    for name, score in student_scores.items():
-        if score > max_score:
-            max_score = score
-            max_student = name
-            
-    print(f"HIGHEST SCORE: {max_score} by {max_student}")
+    print(f"HIGHEST SCORE: {stats['max']} by {stats['max_student']}")
 
 def find_min_score(student_scores):
-    if not student_scores:
+    stats = _engine(student_scores).stats()
+    if not stats["count"]:
         return
-        
-    min_score = 101
-    min_student = ""
-
-    for name, score in student_scores.items():
-        if score < min_score:
-            min_score = score
-            min_student = name
-            
-    print(f"LOWEST SCORE:  {min_score} by {min_student}")
+    print(f"LOWEST SCORE:  {stats['min']} by {stats['min_student']}")
 
 def assign_grades(student_scores):
-    grades = {}
-    distribution = {"A": 0, "B": 0, "C": 0, "D": 0, "F": 0}
-
-    for name, score in student_scores.items():
-        if score >= 90:
-            grade = "A"
-        elif score >= 80:
-            grade = "B"
-        elif score >= 70:
-            grade = "C"
-        elif score >= 60:
-            grade = "D"
-        else:
-            grade = "F"
-        
-        grades[name] = grade
-        distribution[grade] += 1
-        
-    return grades, distribution
+    engine = _engine(student_scores)
+    return engine.grades(), engine.stats()["distribution"]
 
-def print_summary(student_scores, grades):
-    passed = [name for name, score in student_scores.items() if score >= 40]
-    failed = [name for name, score in student_scores.items() if score < 40]
+def _print_class_stats(stats, title="Class Statistics"):
+    print(f"\n--- {title} ---")
+    if "std" in stats:
+        print(f"Rows:          {stats['count']}")
+        print(f"Average Score: {stats['average']:.2f} (std {stats['std']:.2f})")
+    else:
+        print(f"Average Score: {stats['average']:.2f}")
     
-    print("\n--- Class Statistics ---")
-    avg = calculate_average(student_scores)
-    print(f"Average Score: {avg:.2f}")
+    if stats["count"]:
+        print(f"HIGHEST SCORE: {stats['max']} by {stats['max_student']}")
+        print(f"LOWEST SCORE:  {stats['min']} by {stats['min_student']}")
     
-    find_max_score(student_scores)
-    find_min_score(student_scores)
+    print(f"Grade Counts:  {stats['distribution']}")
     
-    _, final_dist = assign_grades(student_scores)
-    print(f"Grade Counts:  {final_dist}")
-    
-    print(f"Passed: {len(passed)} students")
-    print(f"Failed: {len(failed)} students")
+    print(f"Passed: {stats['passed']} students")
+    print(f"Failed: {stats['failed']} students")
+
+def print_summary(student_scores, grades=None):
+    engine = _engine(student_scores)
+    _print_class_stats(engine.stats())
     
     print("\n" + "="*40)
     print(f"{'Name':<20} | {'Marks':<10} | {'Grade':<5}")
     print("-" * 40)
     
-    for name, score in student_scores.items():
-        grade = grades[name]
+    names = engine.names.tolist()
+    letters = engine.grade_letters().tolist() if grades is None else [grades[name] for name in names]
+    for name, score, grade in zip(names, engine.scores.tolist(), letters):
         print(f"{name:<20} | {score:<10.1f} | {grade:<5}")
     print("="*40)
 
@@ -163,8 +371,9 @@ def main():
         print("2. Load from CSV")
         print("3. Add Student to CSV")
         print("4. Exit")
+        print("5. Summarize large CSV (streaming)")
         
-        choice = input("Select an option (1-4): ").strip()
+        choice = input("Select an option (1-5): ").strip()
         student_scores = {}
 
         if choice == '1':
@@ -176,20 +385,29 @@ def main():
             
         elif choice == '3':
             filename = input("Enter CSV filename: ")
-            append_student_record(filename)
-            student_scores = load_csv_data(filename)
+            if append_student_record(filename):
+                # only the appended row is read; the summary sidecar holds the rest
+                _print_class_stats(summarize_csv(filename).stats(), "Class Statistics (streamed)")
+            continue
             
         elif choice == '4':
             print("Goodbye!")
             break
+        
+        elif choice == '5':
+            filename = input("Enter CSV filename: ")
+            if not os.path.exists(filename):
+                print(f"Error: File '{filename}' not found.")
+                continue
+            _print_class_stats(summarize_csv(filename).stats(), "Class Statistics (streamed)")
+            continue
             
         else:
             print("Invalid choice. Try again.")
             continue
 
         if student_scores:
-            final_grades, _ = assign_grades(student_scores)
-            print_summary(student_scores, final_grades)
+            print_summary(GradeEngine.from_dict(student_scores))
         else:
             if choice in ['1', '2', '3']:
                 print("No data loaded.")
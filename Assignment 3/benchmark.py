@@ -0,0 +1,139 @@
+"""
+Cold-start benchmark for Library_manager.
+
+Writes a synthetic catalog.json per scale, then in a fresh process
+times importing the module, opening LibraryInventory, the first ISBN
+lookup and the first title search (which builds the search index), with
+the peak RSS after each step:
+
+    python benchmark.py --scales 100k,1M --out startup.json
+    python benchmark.py --scales 100k --manager /path/to/old/Library_manager.py
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+
+MANAGER = Path(__file__).resolve().with_name("Library_manager.py")
+
+
+def parse_scale(text):
+    """'100k' -> 100_000, '1M' -> 1_000_000."""
+    text = text.strip().upper()
+    factor = {"K": 1_000, "M": 1_000_000}.get(text[-1], 1)
+    return int(float(text.rstrip("KM")) * factor)
+
+
+def write_catalog(path, n_books, seed=0):
+    """A catalog.json in the snapshot format with n_books books, 1 in 10 issued."""
+    words = "river night python garden stone empire winter code silent glass".split()
+    rng = random.Random(seed)
+    catalog = {}
+    for i in range(n_books):
+        isbn = f"978{i:010d}"
+        catalog[isbn] = {"isbn": isbn, "title": " ".join(rng.choice(words) for _ in range(3)) + f" {i}",
+                         "author": f"Author {i % 5000}", "year": 1950 + i % 70,
+                         "status": "issued" if i % 10 == 0 else "available"}
+    with open(path, "w") as f:
+        f.write(json.dumps(catalog))
+
+
+def _rss_mb():
+    """Peak RSS of this process. VmHWM starts fresh at exec, whereas Linux
+    ru_maxrss carries over the parent's high-water mark from before it."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def cold_start(manager, work_dir):
+    """Runs in a fresh spawned process so every step starts cold."""
+    os.chdir(work_dir)   # older versions create logs/ in the working directory at import
+    steps = {}
+
+    def step(name, fn):
+        start = time.perf_counter()
+        value = fn()
+        steps[name] = {"seconds": round(time.perf_counter() - start, 4), "peak_rss_mb": _rss_mb()}
+        return value
+
+    def load_module():
+        spec = importlib.util.spec_from_file_location("Library_manager", manager)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    steps["baseline"] = {"seconds": 0.0, "peak_rss_mb": _rss_mb()}
+    lm = step("import", load_module)
+    library = step("open", lambda: lm.LibraryInventory("catalog.json"))
+    step("first_isbn_lookup", lambda: library.search_by_isbn("9780000000042"))
+    step("first_title_search", lambda: library.search_by_title("river night"))
+    return steps
+
+
+def run_benchmarks(scales, manager, seed):
+    results = []
+    for n_books in scales:
+        work_dir = Path(tempfile.mkdtemp(prefix="library_bench_"))
+        try:
+            write_catalog(work_dir / "catalog.json", n_books, seed)
+            size_mb = (work_dir / "catalog.json").stat().st_size / 2**20
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                steps = pool.submit(cold_start, str(manager), str(work_dir)).result()
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        print(f"\n== {n_books:,} books ({size_mb:.0f} MB catalog) ==")
+        for name, step in steps.items():
+            print(f"{name:<22} {step['seconds']:>9.3f}s  {step['peak_rss_mb'] or 0:>9.1f} MB")
+        results.append({"books": n_books, "catalog_mb": round(size_mb, 1), "steps": steps})
+
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "manager": str(manager),
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for the library manager")
+    parser.add_argument("--scales", default="100k,1M", help="comma separated catalog sizes, e.g. 100k,1M")
+    parser.add_argument("--manager", default=str(MANAGER), help="Library_manager.py to measure")
+    parser.add_argument("--out", default="startup_results.json", help="JSON results file")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    scales = [parse_scale(s) for s in args.scales.split(",") if s.strip()]
+    report = run_benchmarks(scales, Path(args.manager).resolve(), args.seed)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nresults saved to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,198 @@
+"""
+Load test for the Library_manager circulation service.
+
+Seeds a temporary catalog, starts `Library_manager.py --serve` on
+localhost in a subprocess and hammers it from several client processes
+with a mix of issue / return / search requests on a small hot set of
+ISBNs (so the per-ISBN locks are actually contended):
+
+    python load_test.py --books 10000 --clients 8 --duration 10
+    python load_test.py --url http://127.0.0.1:8765 --duration 5
+
+Afterwards every hot ISBN is checked: successful issues minus successful
+returns must be 0 or 1 and match the book's final status, and (when the
+server was spawned here) the persisted catalog must agree after shutdown.
+"""
+import argparse
+import http.client
+import json
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from urllib.parse import urlparse
+
+MANAGER = Path(__file__).resolve().with_name("Library_manager.py")
+
+
+def isbn13(n):
+    body = f"978{n:09d}"
+    check = (10 - sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(body)) % 10) % 10
+    return body + str(check)
+
+
+def seed_catalog(work_dir, n_books):
+    """Writes a JSON-lines feed and bulk imports it into work_dir/catalog.json."""
+    words = "river night python garden stone empire winter code silent glass".split()
+    rng = random.Random(0)
+    feed = work_dir / "feed.jsonl"
+    with feed.open("w") as f:
+        for i in range(n_books):
+            title = " ".join(rng.choice(words) for _ in range(3))
+            f.write(json.dumps({"isbn": isbn13(i), "title": f"{title} {i}",
+                                "author": f"Author {i % 500}", "year": 1950 + i % 70}) + "\n")
+    subprocess.run([sys.executable, str(MANAGER), "catalog.json", "--import", str(feed)],
+                   cwd=work_dir, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return work_dir / "catalog.json"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_until_up(host, port, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"service on {host}:{port} did not come up")
+
+
+def client(host, port, hot, duration, search_ratio, seed):
+    """One keep-alive connection doing random ops until `duration` runs out."""
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection(host, port)
+    latencies, codes, ok = [], {}, {}
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        isbn = rng.choice(hot)
+        if rng.random() < search_ratio:
+            op, method, path = "search", "GET", f"/search?title={rng.choice(['river', 'night+ga', 'stone'])}&limit=20"
+        else:
+            op = rng.choice(("issue", "return"))
+            method, path = "POST", f"/books/{isbn}/{op}"
+        start = time.perf_counter()
+        conn.request(method, path)
+        response = conn.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        codes[f"{op} {response.status}"] = codes.get(f"{op} {response.status}", 0) + 1
+        if op != "search" and response.status == 200:
+            ok.setdefault(isbn, [0, 0])[op == "return"] += 1
+    conn.close()
+    return latencies, codes, ok
+
+
+def get_json(host, port, path):
+    conn = http.client.HTTPConnection(host, port)
+    conn.request("GET", path)
+    body = json.loads(conn.getresponse().read())
+    conn.close()
+    return body
+
+
+def run_load(host, port, hot, clients, duration, search_ratio, seed):
+    initial = {isbn: get_json(host, port, f"/books/{isbn}")["status"] for isbn in hot}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(client, [host] * clients, [port] * clients, [hot] * clients,
+                                [duration] * clients, [search_ratio] * clients,
+                                [seed + i for i in range(clients)]))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(x for r in results for x in r[0])
+    codes, ok = {}, {}
+    for _, c, o in results:
+        for key, value in c.items():
+            codes[key] = codes.get(key, 0) + value
+        for isbn, (issued, returned) in o.items():
+            totals = ok.setdefault(isbn, [0, 0])
+            totals[0] += issued
+            totals[1] += returned
+
+    final = {isbn: get_json(host, port, f"/books/{isbn}")["status"] for isbn in hot}
+    errors = []
+    for isbn in hot:
+        issued, returned = ok.get(isbn, (0, 0))
+        net = issued - returned + (initial[isbn] == "issued")
+        if net not in (0, 1) or (net == 1) != (final[isbn] == "issued"):
+            errors.append(f"{isbn}: {issued} issues, {returned} returns, started "
+                          f"{initial[isbn]}, final {final[isbn]}")
+
+    n = len(latencies)
+    print(f"\n{n:,} requests from {clients} clients in {elapsed:.1f}s -> {n / elapsed:,.0f} req/s")
+    if n:
+        print(f"latency p50 {latencies[n // 2] * 1e3:.2f} ms  p99 {latencies[int(n * 0.99)] * 1e3:.2f} ms"
+              f"  max {latencies[-1] * 1e3:.2f} ms")
+    for key in sorted(codes):
+        print(f"  {key:<12} {codes[key]:>9,}")
+    print(f"service stats: {get_json(host, port, '/stats')}")
+    print("consistency: OK" if not errors else "consistency: FAILED\n  " + "\n  ".join(errors[:20]))
+    return final, errors
+
+
+def check_persisted(catalog, final):
+    """After shutdown the compacted catalog must hold the same statuses the service reported."""
+    with open(catalog) as f:
+        saved = json.load(f)
+    bad = [isbn for isbn, status in final.items() if saved[isbn]["status"] != status]
+    print("persisted state: OK" if not bad else f"persisted state: {len(bad)} ISBNs differ")
+    return bad
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the library circulation service")
+    parser.add_argument("--url", default=None,
+                        help="existing service to test (default: seed a temp catalog and spawn one)")
+    parser.add_argument("--books", type=int, default=10_000, help="catalog size when spawning a service")
+    parser.add_argument("--hot", type=int, default=100, help="number of ISBNs the clients fight over")
+    parser.add_argument("--clients", type=int, default=8, help="client processes (one connection each)")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load")
+    parser.add_argument("--search-ratio", type=float, default=0.1, help="fraction of requests that are searches")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    work_dir = server = None
+    try:
+        if args.url:
+            url = urlparse(args.url)
+            host, port = url.hostname, url.port or 80
+            hot = [isbn13(i) for i in range(args.hot)]
+        else:
+            work_dir = Path(tempfile.mkdtemp(prefix="library_load_"))
+            print(f"seeding {args.books:,} books in {work_dir}")
+            catalog = seed_catalog(work_dir, args.books)
+            host, port = "127.0.0.1", free_port()
+            server = subprocess.Popen([sys.executable, str(MANAGER), "catalog.json", "--serve", f"{host}:{port}"],
+                                      cwd=work_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            wait_until_up(host, port)
+            hot = [isbn13(i) for i in range(min(args.hot, args.books))]
+
+        final, errors = run_load(host, port, hot, args.clients, args.duration, args.search_ratio, args.seed)
+
+        if server:
+            server.send_signal(signal.SIGINT)   # clean shutdown: drain writer, compact
+            server.wait(timeout=60)
+            server = None
+            errors += check_persisted(catalog, final)
+        return 1 if errors else 0
+    finally:
+        if server:
+            server.kill()
+        if work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,14 +1,28 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
 import sys
-from typing import Tuple
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 
+if TYPE_CHECKING:
+    from matplotlib.axes import Axes
+    from matplotlib.figure import Figure
 
-def load_and_clean_data(file_path: str) -> pd.DataFrame:
+
+def load_and_clean_data(file_path: str, max_gap: Optional[str] = None) -> pd.DataFrame:
     """
     Reads CSV, parses 'Date' to datetime, sets it as index,
     and linearly interpolates missing numeric values.
+    With max_gap (e.g. '3D') interpolation is done against the
+    timestamps instead of row position - see interpolate_time_gaps.
     """
     df = pd.read_csv(file_path)
 
@@ -16,8 +30,12 @@ def load_and_clean_data(file_path: str) -> pd.DataFrame:
         raise ValueError("CSV must contain a 'Date' column")
 
     df['Date'] = pd.to_datetime(df['Date'])
-    df = df.set_index('Date').sort_index()
+    df.set_index('Date', inplace=True)
+
+    if max_gap is not None:
+        return interpolate_time_gaps(df, max_gap)
 
+    df = df.sort_index()
     numeric_cols = df.select_dtypes(include=[np.number]).columns
     if len(numeric_cols) > 0:
         df[numeric_cols] = df[numeric_cols].interpolate(method='linear', limit_direction='both')
@@ -25,56 +43,417 @@ def load_and_clean_data(file_path: str) -> pd.DataFrame:
     return df
 
 
-def analyze_data(df: pd.DataFrame) -> pd.DataFrame:
+def interpolate_time_gaps(df: pd.DataFrame, max_gap: str = '3D') -> pd.DataFrame:
+    """
+    Gap-aware cleaning, in place on df (which is also returned).
+
+    Each missing numeric value is interpolated linearly against the
+    DatetimeIndex, so uneven spacing is respected. It is only filled
+    when the valid readings on either side are at most max_gap apart;
+    leading/trailing values are filled from the nearest reading if it
+    is within max_gap. Longer gaps stay NaN instead of skewing monthly
+    means. Each filled column gets a boolean '<column>_filled' mask.
+    Columns are replaced one at a time; the numeric block is never
+    copied as a whole.
+    """
+    if not df.index.is_monotonic_increasing:
+        df.sort_index(inplace=True)
+
+    limit = pd.Timedelta(max_gap).value
+    t = df.index.values.astype('datetime64[ns]').astype(np.int64)
+
+    for col in df.select_dtypes(include=[np.number]).columns:
+        values = df[col].to_numpy(dtype=float, copy=True)
+        missing = np.isnan(values)
+        if not missing.any():
+            continue
+
+        valid = np.flatnonzero(~missing)
+        holes = np.flatnonzero(missing)
+        filled = np.zeros(len(values), dtype=bool)
+        if len(valid):
+            # index (into valid) of the first valid reading after each hole
+            right = np.searchsorted(valid, holes)
+            left_t = t[valid[np.maximum(right - 1, 0)]]
+            right_t = t[valid[np.minimum(right, len(valid) - 1)]]
+            inner = (right > 0) & (right < len(valid))
+            ok = np.where(inner, right_t - left_t <= limit,
+                          np.where(right == 0, right_t - t[holes] <= limit,
+                                   t[holes] - left_t <= limit))
+            # np.interp clamps outside the valid range, i.e. nearest value at the edges
+            values[holes[ok]] = np.interp(t[holes[ok]], t[valid], values[valid])
+            filled[holes[ok]] = True
+
+        df[col] = values
+        df[f'{col}_filled'] = filled
+
+    return df
+
+
+DEFAULT_CACHE_DIR = Path.home() / '.cache' / 'weather_analysis'
+MEMORY_CACHE_SIZE = 8
+_memory_cache: 'OrderedDict[tuple, pd.DataFrame]' = OrderedDict()
+
+
+def _file_hash(path: Path, block_size: int = 1 << 20) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def load_cached(file_path: str, max_gap: Optional[str] = None,
+                cache_dir: Optional[Path] = DEFAULT_CACHE_DIR,
+                max_cache_mb: float = 512) -> pd.DataFrame:
+    """
+    load_and_clean_data with two cache layers:
+    - an in-process LRU of the last MEMORY_CACHE_SIZE frames, keyed by
+      path, size, mtime and cleaning options
+    - an on-disk .npz per file in cache_dir (one array per column plus
+      the index, with its time zone kept in the metadata), valid while the size matches and either the mtime or
+      the content hash does; least recently used entries are evicted
+      beyond max_cache_mb
+    A hit skips CSV and date parsing entirely. cache_dir=None turns
+    the disk layer off. Returns a copy, so callers may modify it.
+    """
+    path = Path(file_path).resolve()
+    stat = path.stat()
+    memory_key = (str(path), stat.st_size, stat.st_mtime_ns, max_gap)
+    if memory_key in _memory_cache:
+        _memory_cache.move_to_end(memory_key)
+        return _memory_cache[memory_key].copy()
+
+    df = None
+    if cache_dir is not None:
+        cache_dir = Path(cache_dir)
+        key = hashlib.blake2b(f"{path}|{max_gap}".encode(), digest_size=16).hexdigest()
+        data_file, meta_file = cache_dir / f"{key}.npz", cache_dir / f"{key}.json"
+        df = _read_disk_cache(data_file, meta_file, path, stat)
+        if df is None:
+            df = load_and_clean_data(str(path), max_gap)
+            _write_disk_cache(df, data_file, meta_file, path, stat)
+            _evict(cache_dir, max_cache_mb * 1024 * 1024)
+    else:
+        df = load_and_clean_data(str(path), max_gap)
+
+    _memory_cache[memory_key] = df
+    while len(_memory_cache) > MEMORY_CACHE_SIZE:
+        _memory_cache.popitem(last=False)
+    return df.copy()
+
+
+def _read_disk_cache(data_file: Path, meta_file: Path, path: Path,
+                     stat: os.stat_result) -> Optional[pd.DataFrame]:
+    try:
+        with meta_file.open('r') as f:
+            meta = json.load(f)
+        if meta['size'] != stat.st_size:
+            return None
+        if meta['mtime_ns'] != stat.st_mtime_ns:
+            if meta['hash'] != _file_hash(path):
+                return None
+            meta['mtime_ns'] = stat.st_mtime_ns
+            with meta_file.open('w') as f:
+                json.dump(meta, f)
+        with np.load(data_file, allow_pickle=False) as data:
+            columns = {name: data[f"col{i}"] for i, name in enumerate(meta['columns'])}
+            index = pd.DatetimeIndex(data['index'], name=meta['index_name'])
+        if meta['tz'] is not None:
+            # the arrays hold UTC instants; restore the zone the loader returned
+            index = index.tz_localize('UTC').tz_convert(meta['tz'])
+        if str(index.dtype) != meta['index_dtype']:
+            return None
+    except (OSError, ValueError, KeyError):
+        return None
+
+    for name in meta['object_columns']:
+        columns[name] = columns[name].astype(object)
+    os.utime(data_file)   # mark as recently used for eviction
+    return pd.DataFrame(columns, index=index)
+
+
+def _write_disk_cache(df: pd.DataFrame, data_file: Path, meta_file: Path, path: Path,
+                      stat: os.stat_result) -> None:
+    tz = getattr(df.index, 'tz', None)
+    if tz is not None:
+        try:
+            pd.DatetimeIndex([], tz='UTC').tz_convert(str(tz))
+        except (ValueError, KeyError):
+            return   # a zone that cannot be rebuilt from its name is not cached
+    data_file.parent.mkdir(parents=True, exist_ok=True)
+    arrays = {'index': df.index.values}
+    object_columns = []
+    for i, name in enumerate(df.columns):
+        values = df[name].to_numpy()
+        if values.dtype == object:
+            if pd.isna(values).any():
+                return   # missing text values would not survive the round trip
+            values = values.astype(str)
+            object_columns.append(name)
+        arrays[f"col{i}"] = values
+
+    tmp = data_file.with_name(data_file.stem + '.tmp.npz')
+    np.savez(tmp, **arrays)
+    os.replace(tmp, data_file)
+    meta = {'path': str(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+            'hash': _file_hash(path), 'columns': [str(c) for c in df.columns],
+            'object_columns': object_columns, 'index_name': df.index.name,
+            'tz': str(tz) if tz is not None else None, 'index_dtype': str(df.index.dtype)}
+    with meta_file.open('w') as f:
+        json.dump(meta, f)
+
+
+def _evict(cache_dir: Path, max_bytes: float) -> None:
+    """Deletes least recently used entries until the cache fits in max_bytes."""
+    entries = sorted(cache_dir.glob('*.npz'), key=lambda p: p.stat().st_mtime)
+    total = sum(p.stat().st_size for p in entries)
+    for data_file in entries:
+        if total <= max_bytes:
+            break
+        total -= data_file.stat().st_size
+        data_file.unlink(missing_ok=True)
+        data_file.with_suffix('.json').unlink(missing_ok=True)
+
+
+def clear_cache(cache_dir: Path = DEFAULT_CACHE_DIR) -> int:
+    """Empties the in-process LRU and the disk cache; returns the number of files removed."""
+    _memory_cache.clear()
+    removed = 0
+    if Path(cache_dir).is_dir():
+        for f in Path(cache_dir).iterdir():
+            if f.suffix in ('.npz', '.json'):
+                f.unlink()
+                removed += 1
+    return removed
+
+
+def analyze_data(df: pd.DataFrame, extra_stats: Sequence[str] = ()) -> pd.DataFrame:
     """
     Resamples to monthly ('M') and computes:
     - mean/min/max for Temperature_C
     - total (sum) for Rainfall_mm
     Returns a DataFrame with columns: MonthlyMeanTemp, MonthlyMinTemp, MonthlyMaxTemp, MonthlyTotalRainfall.
+
+    All statistics come from one grouping of rows by month code
+    (bincount / reduceat), not one resample per column. extra_stats
+    adds columns in the same pass:
+    - 'std'        -> MonthlyStdTemp
+    - 'pNN'        -> MonthlyPNNTemp (percentile, e.g. 'p90')
+    - 'rainy_days' -> MonthlyRainyDays (rows with Rainfall_mm > 0)
     """
     if 'Temperature_C' not in df.columns:
         raise ValueError("DataFrame must contain 'Temperature_C' column")
     if 'Rainfall_mm' not in df.columns:
         raise ValueError("DataFrame must contain 'Rainfall_mm' column")
+    for stat in extra_stats:
+        if stat not in ('std', 'rainy_days') and not (stat[:1] == 'p' and stat[1:].isdigit()):
+            raise ValueError(f"Unknown statistic: {stat}")
+
+    # months are cut on local wall time, as resample does for a tz-aware index
+    tz = getattr(df.index, 'tz', None)
+    dates = (df.index.tz_localize(None) if tz is not None else df.index).values
+    temp = df['Temperature_C'].to_numpy(dtype=float)
+    rain = df['Rainfall_mm'].to_numpy(dtype=float)
+    known = ~np.isnat(dates)
+    if not known.all():
+        # rows without a date belong to no month (resample drops them)
+        dates, temp, rain = dates[known], temp[known], rain[known]
+
+    columns = ['MonthlyMeanTemp', 'MonthlyMinTemp', 'MonthlyMaxTemp', 'MonthlyTotalRainfall']
+    if len(dates) == 0:
+        return pd.DataFrame(columns=columns, index=pd.DatetimeIndex([], name=df.index.name, tz=tz))
+
+    if (dates[1:] < dates[:-1]).any():
+        order = np.argsort(dates, kind='stable')
+        dates, temp, rain = dates[order], temp[order], rain[order]
+
+    # one grouping: month boundaries located with searchsorted on the sorted index
+    first, last = dates[[0, -1]].astype('datetime64[M]')
+    month_starts = np.arange(first, last + 2).astype(dates.dtype)
+    bounds = np.searchsorted(dates, month_starts)
+    sizes = np.diff(bounds)
+    n_months = len(sizes)
+    nonempty = sizes > 0
+    starts = bounds[:-1][nonempty]
+
+    def per_month(values, reduce, fill):
+        out = np.full(n_months, fill, dtype=float)
+        out[nonempty] = reduce.reduceat(values, starts)
+        return out
+
+    valid = ~np.isnan(temp)
+    count = per_month(valid.astype(float), np.add, 0.0)
+    total = per_month(np.where(valid, temp, 0.0), np.add, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+
+    stats = {
+        'MonthlyMeanTemp': mean,
+        # fmin/fmax skip NaN; months without rows stay NaN like resample
+        'MonthlyMinTemp': per_month(temp, np.fmin, np.nan),
+        'MonthlyMaxTemp': per_month(temp, np.fmax, np.nan),
+        'MonthlyTotalRainfall': per_month(np.nan_to_num(rain), np.add, 0.0),
+    }
+
+    percentiles = [int(stat[1:]) for stat in extra_stats if stat.startswith('p')]
+    for stat in extra_stats:
+        if stat == 'std':
+            dev = np.where(valid, temp - np.repeat(mean, sizes), 0.0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                var = per_month(dev * dev, np.add, 0.0) / (count - 1)
+            stats['MonthlyStdTemp'] = np.where(count > 1, np.sqrt(var), np.nan)
+        elif stat == 'rainy_days':
+            stats['MonthlyRainyDays'] = per_month((rain > 0).astype(float), np.add, 0.0)
+
+    if percentiles:
+        values = np.full((n_months, len(percentiles)), np.nan)
+        for m in np.flatnonzero(count > 0):
+            values[m] = np.nanpercentile(temp[bounds[m]:bounds[m + 1]], percentiles)
+        for i, p in enumerate(percentiles):
+            stats[f'MonthlyP{p}Temp'] = values[:, i]
+
+    index = pd.DatetimeIndex(month_starts[1:] - np.timedelta64(1, 'D'), name=df.index.name, freq='ME')
+    if tz is not None:
+        index = index.tz_localize(tz)
+    return pd.DataFrame(stats, index=index)
+
+
+class _StreamingColumn:
+    """
+    Monthly count/sum/min/max of one column, fed chunk by chunk.
+
+    Reproduces load_and_clean_data's interpolation (linear by row
+    position, both directions) across chunk boundaries: a trailing run
+    of NaNs is held back until the next valid value arrives, so only
+    the last valid value and that run are carried between chunks.
+    """
+
+    def __init__(self):
+        self.monthly = None        # DataFrame indexed by month: count, sum, min, max
+        self.last_valid = None
+        self.pending_months = np.empty(0, dtype=np.int64)
+
+    def add(self, values, months):
+        carried = self.last_valid is not None
+        vals = np.concatenate([[self.last_valid] if carried else [],
+                               np.full(len(self.pending_months), np.nan), values])
+        months = np.concatenate([[0] if carried else [], self.pending_months, months]).astype(np.int64)
 
-    monthly_mean_temp = df['Temperature_C'].resample('ME').mean()
-    monthly_min_temp = df['Temperature_C'].resample('ME').min()
-    monthly_max_temp = df['Temperature_C'].resample('ME').max()
-    monthly_total_rain = df['Rainfall_mm'].resample('ME').sum()
+        filled = pd.Series(vals).interpolate(method='linear', limit_area='inside').to_numpy(copy=True)
+        valid = np.flatnonzero(~np.isnan(filled))
+        if len(valid) == 0:
+            self.pending_months = months[1:] if carried else months
+            return
 
-    df_monthly = pd.DataFrame({
-        'MonthlyMeanTemp': monthly_mean_temp,
-        'MonthlyMinTemp': monthly_min_temp,
-        'MonthlyMaxTemp': monthly_max_temp,
-        'MonthlyTotalRainfall': monthly_total_rain,
-    })
+        if not carried:
+            filled[:valid[0]] = filled[valid[0]]   # leading NaNs at the start of the file
+        done = valid[-1] + 1
+        self.last_valid = filled[valid[-1]]
+        self.pending_months = months[done:]
 
-    return df_monthly
+        start = 1 if carried else 0
+        self._accumulate(filled[start:done], months[start:done])
 
+    def finish(self):
+        """Trailing NaNs at the end of the file take the last valid value."""
+        if len(self.pending_months) and self.last_valid is not None:
+            self._accumulate(np.full(len(self.pending_months), self.last_valid), self.pending_months)
+        self.pending_months = self.pending_months[:0]
 
-def create_visualizations(df_monthly: pd.DataFrame) -> Tuple[plt.Figure, plt.Axes]:
+    def _accumulate(self, values, months):
+        part = pd.Series(values).groupby(months).agg(['count', 'sum', 'min', 'max'])
+        if self.monthly is None:
+            self.monthly = part
+        else:
+            self.monthly = pd.concat([self.monthly, part]).groupby(level=0).agg(
+                {'count': 'sum', 'sum': 'sum', 'min': 'min', 'max': 'max'})
+
+
+def analyze_csv_streaming(file_path: str, chunksize: int = 1_000_000) -> pd.DataFrame:
     """
-    Generates three plots:
-    1) Line chart for monthly mean temperature
-    2) Bar chart for monthly total rainfall
-    3) Combined figure with twin axes (line + bars)
-    Returns the combined figure and its primary axis.
+    One-pass, out-of-core equivalent of analyze_data(load_and_clean_data(path)).
+    Reads the CSV in chunks and keeps running monthly accumulators, so
+    memory is bounded by the number of months, not rows.
+    Rows must be sorted by Date (as station exports are).
     """
-    fig1, ax1 = plt.subplots(figsize=(10, 4))
+    temperature, rainfall = _StreamingColumn(), _StreamingColumn()
+    previous_date, date_dtype = None, 'datetime64[ns]'
+
+    for chunk in pd.read_csv(file_path, chunksize=chunksize):
+        if 'Date' not in chunk.columns:
+            raise ValueError("CSV must contain a 'Date' column")
+        if 'Temperature_C' not in chunk.columns:
+            raise ValueError("DataFrame must contain 'Temperature_C' column")
+        if 'Rainfall_mm' not in chunk.columns:
+            raise ValueError("DataFrame must contain 'Rainfall_mm' column")
+        if chunk.empty:   # header-only file
+            continue
+
+        dates = pd.to_datetime(chunk['Date']).to_numpy()
+        if (previous_date is not None and dates[0] < previous_date) or (np.diff(dates) < np.timedelta64(0)).any():
+            raise ValueError("Streaming mode needs rows sorted by 'Date'")
+        previous_date, date_dtype = dates[-1], dates.dtype
+
+        months = dates.astype('datetime64[M]').astype(np.int64)
+        temperature.add(chunk['Temperature_C'].to_numpy(dtype=float), months)
+        rainfall.add(chunk['Rainfall_mm'].to_numpy(dtype=float), months)
+
+    temperature.finish()
+    rainfall.finish()
+
+    known = [c.monthly.index for c in (temperature, rainfall) if c.monthly is not None]
+    if not known:
+        return pd.DataFrame(columns=['MonthlyMeanTemp', 'MonthlyMinTemp',
+                                     'MonthlyMaxTemp', 'MonthlyTotalRainfall'])
+
+    first = min(idx.min() for idx in known)
+    last = max(idx.max() for idx in known)
+    codes = np.arange(first, last + 1)
+    temp = (temperature.monthly if temperature.monthly is not None
+            else pd.DataFrame(columns=['count', 'sum', 'min', 'max'], dtype=float)).reindex(codes)
+    rain = (rainfall.monthly['sum'] if rainfall.monthly is not None
+            else pd.Series(dtype=float)).reindex(codes)
+
+    month_ends = ((codes.astype('datetime64[M]') + 1).astype('datetime64[D]')
+                  - np.timedelta64(1, 'D')).astype(date_dtype)
+    month_ends = pd.DatetimeIndex(month_ends, name='Date')
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = temp['sum'].to_numpy(dtype=float) / temp['count'].to_numpy(dtype=float)
+
+    return pd.DataFrame({
+        'MonthlyMeanTemp': mean,
+        'MonthlyMinTemp': temp['min'].to_numpy(dtype=float),
+        'MonthlyMaxTemp': temp['max'].to_numpy(dtype=float),
+        'MonthlyTotalRainfall': rain.fillna(0.0).to_numpy(dtype=float),
+    }, index=month_ends)
+
+
+FIGURES = ('mean_temp', 'rainfall', 'combined')
+
+
+def _draw_mean_temp(fig: 'Figure', df_monthly: pd.DataFrame) -> 'Axes':
+    ax1 = fig.add_subplot()
     ax1.plot(df_monthly.index, df_monthly['MonthlyMeanTemp'], color='tab:red', linewidth=2)
     ax1.set_title('Monthly Mean Temperature (°C)')
     ax1.set_xlabel('Month')
     ax1.set_ylabel('Temperature (°C)')
-    fig1.tight_layout()
+    fig.tight_layout()
+    return ax1
+
 
-    fig2, ax2 = plt.subplots(figsize=(10, 4))
+def _draw_rainfall(fig: 'Figure', df_monthly: pd.DataFrame) -> 'Axes':
+    ax2 = fig.add_subplot()
     ax2.bar(df_monthly.index, df_monthly['MonthlyTotalRainfall'], color='tab:blue', width=20)  # width ~ days
     ax2.set_title('Monthly Total Rainfall (mm)')
     ax2.set_xlabel('Month')
     ax2.set_ylabel('Rainfall (mm)')
-    fig2.tight_layout()
+    fig.tight_layout()
+    return ax2
 
-    fig3, ax3 = plt.subplots(figsize=(11, 5))
+
+def _draw_combined(fig: 'Figure', df_monthly: pd.DataFrame) -> 'Axes':
+    ax3 = fig.add_subplot()
     ax3.plot(df_monthly.index, df_monthly['MonthlyMeanTemp'], color='tab:red', linewidth=2, label='Mean Temp (°C)')
     ax3.set_xlabel('Month')
     ax3.set_ylabel('Temperature (°C)', color='tab:red')
@@ -85,32 +464,202 @@ def create_visualizations(df_monthly: pd.DataFrame) -> Tuple[plt.Figure, plt.Axe
     ax3b.set_ylabel('Rainfall (mm)', color='tab:blue')
     ax3b.tick_params(axis='y', labelcolor='tab:blue')
 
-    fig3.suptitle('Monthly Temperature and Rainfall')
+    fig.suptitle('Monthly Temperature and Rainfall')
     lines, labels = ax3.get_legend_handles_labels()
     lines2, labels2 = ax3b.get_legend_handles_labels()
     ax3.legend(lines + lines2, labels + labels2, loc='upper left')
 
-    fig3.tight_layout()
-    return fig3, ax3
+    fig.tight_layout()
+    return ax3
+
+
+_DRAW = {'mean_temp': (_draw_mean_temp, (10, 4)),
+         'rainfall': (_draw_rainfall, (10, 4)),
+         'combined': (_draw_combined, (11, 5))}
+
+
+def create_visualizations(df_monthly: pd.DataFrame) -> Tuple['Figure', 'Axes']:
+    """
+    Generates the combined figure with twin axes (monthly mean
+    temperature line + total rainfall bars) as a pyplot figure and
+    returns it with its primary axis. Only this figure is created, so
+    no unreferenced figures pile up in pyplot; the separate mean_temp
+    and rainfall charts come from render_figures.
+    Interactive helper (pyplot figures); scripts should use render_figures.
+    """
+    import matplotlib.pyplot as plt
+
+    draw, figsize = _DRAW['combined']
+    fig = plt.figure(figsize=figsize)
+    return fig, draw(fig, df_monthly)
+
+
+def render_figures(df_monthly: pd.DataFrame, outputs: Dict[str, str], dpi: int = 150) -> List[str]:
+    """
+    Builds only the figures named in outputs ({figure name: path},
+    names from FIGURES), saves each and closes it right away.
+    Uses the Agg canvas directly, so pyplot and interactive backends
+    are never imported.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    saved = []
+    for name, path in outputs.items():
+        if name not in _DRAW:
+            raise ValueError(f"Unknown figure: {name} (choose from {', '.join(FIGURES)})")
+        draw, figsize = _DRAW[name]
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        try:
+            draw(fig, df_monthly)
+            fig.savefig(path, dpi=dpi)
+            saved.append(path)
+        finally:
+            fig.clear()
+    return saved
+
+
+def process_station(file_path: str, out_dir: str, stream: bool = False,
+                    chunksize: int = 1_000_000, max_gap: Optional[str] = None,
+                    figures: Sequence[str] = ('combined',),
+                    cache_dir: Optional[Path] = None, max_cache_mb: float = 512) -> dict:
+    """
+    Batch worker: analyzes one station file and saves its plots in
+    out_dir (<station>.png for the combined figure, <station>_<name>.png
+    for the others; none if figures is empty). Never raises, so one bad
+    file cannot stop the batch; errors are returned in the result instead.
+    """
+    start = time.perf_counter()
+    station = Path(file_path).stem
+    try:
+        if stream:
+            df_monthly = analyze_csv_streaming(file_path, chunksize)
+        else:
+            df_monthly = analyze_data(load_cached(file_path, max_gap, cache_dir, max_cache_mb))
+        outputs = {name: str(Path(out_dir) / (f"{station}.png" if name == 'combined'
+                                              else f"{station}_{name}.png"))
+                   for name in figures}
+        saved = render_figures(df_monthly, outputs)
+    except Exception as e:
+        return {'station': station, 'path': file_path, 'error': f"{type(e).__name__}: {e}",
+                'seconds': time.perf_counter() - start}
+    return {'station': station, 'path': file_path, 'monthly': df_monthly,
+            'outputs': saved, 'seconds': time.perf_counter() - start}
+
+
+def resolve_inputs(target: str) -> List[str]:
+    """A directory (all *.csv in it), a glob pattern, or a single file."""
+    path = Path(target)
+    if path.is_dir():
+        return sorted(str(p) for p in path.glob('*.csv'))
+    if any(ch in target for ch in '*?['):
+        return sorted(glob.glob(target))
+    return [target]
+
+
+def run_batch(files: List[str], out_dir: str, workers: Optional[int] = None, **options) -> int:
+    """
+    Fans process_station out over a process pool (figures are rendered
+    in the workers), then writes combined_monthly.csv with every
+    station's monthly table and prints a throughput summary.
+    options are passed on to process_station.
+    """
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    tables, failures = {}, []
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(process_station, f, out_dir, **options) for f in files]
+        for future in as_completed(futures):
+            result = future.result()
+            if 'error' in result:
+                failures.append(result)
+                print(f"FAILED {result['path']}: {result['error']}")
+            else:
+                tables[result['station']] = result['monthly']
+                print(f"Processed {result['station']} ({result['seconds']:.2f}s)"
+                      + "".join(f", saved {path}" for path in result['outputs']))
+
+    if tables:
+        combined = pd.concat(tables, names=['Station']).sort_index()
+        combined_path = Path(out_dir) / 'combined_monthly.csv'
+        combined.to_csv(combined_path)
+        print(f"Saved combined monthly table to {combined_path}")
+
+    elapsed = time.perf_counter() - start
+    print(f"\n{len(tables)} stations processed, {len(failures)} failed, "
+          f"{elapsed:.2f}s total ({len(files) / max(elapsed, 1e-9):.1f} files/sec)")
+    return 1 if failures else 0
 
 
 def main(argv=None):
-    argv = argv or sys.argv[1:]
-    if len(argv) < 1:
-        print("Usage: python weather_analysis.py <path_to_csv>")
-        print("CSV must include columns: 'Date', 'Temperature_C', 'Rainfall_mm'")
-        return 1
-
-    file_path = argv[0]
-    df = load_and_clean_data(file_path)
-    df_monthly = analyze_data(df)
-    fig, _ = create_visualizations(df_monthly)
-
-    output_path = 'output_plot.png'
-    fig.savefig(output_path, dpi=150)
-    print(f"Saved combined plot to {output_path}")
+    parser = argparse.ArgumentParser(
+        description="Monthly temperature/rainfall analysis. "
+                    "CSV must include columns: 'Date', 'Temperature_C', 'Rainfall_mm'")
+    parser.add_argument('csv', help='path to the weather CSV, or a directory / glob for batch mode')
+    parser.add_argument('--stream', action='store_true',
+                        help='aggregate in one pass over chunks (for files larger than memory)')
+    parser.add_argument('--chunksize', type=int, default=1_000_000,
+                        help='rows per chunk in --stream mode')
+    parser.add_argument('--out-dir', default='weather_outputs',
+                        help='batch mode: folder for per-station plots and combined_monthly.csv')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='batch mode: worker processes (default: CPU count)')
+    parser.add_argument('--max-gap', default=None,
+                        help="interpolate against time, filling only gaps up to this long (e.g. 3D)")
+    parser.add_argument('--figures', default='combined',
+                        help=f"comma separated figures to render: {', '.join(FIGURES)}")
+    parser.add_argument('--no-plot', action='store_true',
+                        help='skip plotting and only write the monthly table')
+    parser.add_argument('--table', default='monthly_summary.csv',
+                        help='monthly table written by --no-plot (single file mode)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='parse the CSV even if a cached copy exists, and do not cache it')
+    parser.add_argument('--clear-cache', action='store_true',
+                        help='delete all cached datasets before running')
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR),
+                        help='folder for cached parsed datasets')
+    parser.add_argument('--cache-max-mb', type=float, default=512,
+                        help='size limit of the dataset cache, least recently used entries are evicted')
+    args = parser.parse_args(argv if argv is not None else sys.argv[1:])
+    if args.clear_cache:
+        print(f"Removed {clear_cache(args.cache_dir)} cache files from {args.cache_dir}")
+    cache_dir = None if args.no_cache else Path(args.cache_dir)
+    if args.stream and args.max_gap:
+        parser.error("--max-gap is not supported with --stream")
+    figures = [] if args.no_plot else [f.strip() for f in args.figures.split(',') if f.strip()]
+    for name in figures:
+        if name not in FIGURES:
+            parser.error(f"unknown figure {name!r} (choose from {', '.join(FIGURES)})")
+
+    files = resolve_inputs(args.csv)
+    if files != [args.csv]:
+        if not files:
+            print(f"No CSV files match {args.csv}")
+            return 1
+        return run_batch(files, args.out_dir, args.workers, stream=args.stream,
+                         chunksize=args.chunksize, max_gap=args.max_gap, figures=figures,
+                         cache_dir=cache_dir, max_cache_mb=args.cache_max_mb)
+
+    file_path = args.csv
+    if args.stream:
+        df_monthly = analyze_csv_streaming(file_path, args.chunksize)
+    else:
+        df = load_cached(file_path, args.max_gap, cache_dir, args.cache_max_mb)
+        df_monthly = analyze_data(df)
+
+    if args.no_plot:
+        df_monthly.to_csv(args.table)
+        print(f"Saved monthly table to {args.table}")
+        return 0
+
+    outputs = {name: 'output_plot.png' if name == 'combined' else f'output_{name}.png'
+               for name in figures}
+    for output_path in render_figures(df_monthly, outputs):
+        print(f"Saved plot to {output_path}")
     return 0
 
 
 if __name__ == '__main__':
-    raise SystemExit(main())
\ No newline at end of file
+    raise SystemExit(main())
@@ -0,0 +1,274 @@
+"""
+Benchmark suite for the energy pipeline.
+
+Generates deterministic synthetic building CSVs (N buildings x M hours,
+optionally with malformed lines), times every stage of
+energy_dashboard at several scales and writes the results as JSON so
+two runs can be compared:
+
+    python benchmark.py --scales 10k,1M --out bench.json
+    python benchmark.py --scales 10k,1M --out new.json --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+HOURS_PER_YEAR = 8760
+
+
+def generate_synthetic_data(out_dir, n_buildings, n_hours, bad_line_rate=0.001,
+                            start="2024-01-01", seed=0):
+    """
+    Writes building0000.csv ... with `timestamp,kwh` rows: a daily load
+    curve per building plus noise. A `bad_line_rate` fraction of lines
+    is malformed - too many fields (dropped by on_bad_lines='skip'),
+    an unparsable timestamp, or an empty kWh value.
+    Same arguments -> byte-identical files.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+
+    timestamps = pd.date_range(start, periods=n_hours, freq="h")
+    ts_text = np.asarray(timestamps.strftime("%Y-%m-%d %H:%M"), dtype=object)
+    daily_curve = 1 + 0.5 * np.sin((timestamps.hour.to_numpy() - 6) / 24 * 2 * np.pi)
+
+    files = []
+    for b in range(n_buildings):
+        base = rng.uniform(50, 300)
+        kwh = np.round(base * daily_curve + rng.normal(0, base * 0.05, n_hours), 2)
+        lines = ts_text + "," + kwh.astype(str).astype(object)
+
+        n_bad = rng.binomial(n_hours, bad_line_rate)
+        if n_bad:
+            rows = rng.choice(n_hours, size=n_bad, replace=False)
+            kinds = rng.integers(0, 3, size=n_bad)
+            for row, kind in zip(rows, kinds):
+                if kind == 0:
+                    lines[row] = lines[row] + ",oops,extra"
+                elif kind == 1:
+                    lines[row] = "not-a-date," + lines[row].split(",")[1]
+                else:
+                    lines[row] = lines[row].split(",")[0] + ","
+
+        path = out_dir / f"building{b:04d}.csv"
+        with path.open("w") as f:
+            f.write("timestamp,kwh\n")
+            f.write("\n".join(lines))
+            f.write("\n")
+        files.append(path)
+
+    return files
+
+
+def parse_scale(text):
+    """'10k' -> 10_000, '1M' -> 1_000_000, '50M' -> 50_000_000."""
+    text = text.strip().upper()
+    factor = {"K": 1_000, "M": 1_000_000}.get(text[-1], 1)
+    return int(float(text.rstrip("KM")) * factor)
+
+
+def shape_for(rows):
+    """Buildings x hours for a row count: up to one year per building."""
+    n_buildings = max(1, -(-rows // HOURS_PER_YEAR))
+    return n_buildings, rows // n_buildings
+
+
+def _rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _time_stage(results, name, fn, *args, **kwargs):
+    start = time.perf_counter()
+    value = fn(*args, **kwargs)
+    results[name] = {"seconds": round(time.perf_counter() - start, 4),
+                     "peak_rss_mb": _rss_mb()}
+    return value
+
+
+def run_scale(data_dir, max_scatter_rows):
+    """
+    Runs in a fresh process per scale so peak RSS is not polluted by
+    earlier scales. peak_rss_mb is the process high-water mark after
+    each stage.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import energy_dashboard as ed
+
+    os.chdir(data_dir)   # dashboards are written to the working directory
+    stages = {}
+
+    df = _time_stage(stages, "load_and_validate_data",
+                     ed.load_and_validate_data, data_dir, use_cache=False)
+    _time_stage(stages, "load_and_validate_data_parallel",
+                ed.load_and_validate_data_parallel, data_dir)
+    daily = _time_stage(stages, "calculate_daily_totals", ed.calculate_daily_totals, df)
+    weekly = _time_stage(stages, "calculate_weekly_aggregates", ed.calculate_weekly_aggregates, df)
+    summary = _time_stage(stages, "building_wise_summary", ed.building_wise_summary, df)
+
+    manager = ed.BuildingManager()
+    _time_stage(stages, "BuildingManager.ingest_dataframe", manager.ingest_dataframe, df)
+
+    _time_stage(stages, "create_dashboard_fast", ed.create_dashboard_fast, df, daily, weekly, summary)
+    if len(df) <= max_scatter_rows:
+        _time_stage(stages, "create_dashboard", ed.create_dashboard, df.copy(), daily, weekly, summary)
+        plt.close("all")
+
+    return {"rows_loaded": len(df), "stages": stages}
+
+
+def measure_reading_memory(n=200_000):
+    """
+    Bytes per reading for n readings added one by one: the old layout
+    (a plain object per reading holding a pd.Timestamp and a NumPy
+    scalar) against Building's int64/float buffers.
+    """
+    import tracemalloc
+    import energy_dashboard as ed
+
+    class ObjectReading:   # the pre-__slots__ MeterReading
+        def __init__(self, timestamp, kwh):
+            self.timestamp = timestamp
+            self.kwh = kwh
+
+    timestamps = pd.date_range("2024-01-01", periods=n, freq="h")
+    kwh = np.random.default_rng(0).uniform(50, 300, n)
+
+    def measure(build):
+        tracemalloc.start()
+        kept = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del kept
+        return size
+
+    def objects():
+        return [ObjectReading(ts, value) for ts, value in zip(timestamps, kwh)]
+
+    def buffers(kwh_dtype):
+        def build():
+            building = ed.Building("bench", kwh_dtype)
+            for ts, value in zip(timestamps.asi8, kwh):
+                building.add_reading(np.datetime64(int(ts), "ns"), value)
+            return building
+        return build
+
+    results = {"readings": n,
+               "object_bytes_per_reading": measure(objects) / n,
+               "buffer_f64_bytes_per_reading": measure(buffers(np.float64)) / n,
+               "buffer_f32_bytes_per_reading": measure(buffers(np.float32)) / n}
+    print(f"\n== reading memory, {n:,} readings ==")
+    for key, value in results.items():
+        if key != "readings":
+            print(f"{key:<36} {value:>10.1f} B")
+    return results
+
+
+def run_benchmarks(scales, max_scatter_rows, bad_line_rate, seed, keep_data=None,
+                   reading_memory=0):
+    results = []
+    for rows in scales:
+        n_buildings, n_hours = shape_for(rows)
+        data_dir = Path(keep_data) / f"{rows}" if keep_data else Path(tempfile.mkdtemp(prefix="energy_bench_"))
+        print(f"\n== {rows:,} rows ({n_buildings} buildings x {n_hours} hours) ==")
+
+        start = time.perf_counter()
+        generate_synthetic_data(data_dir, n_buildings, n_hours, bad_line_rate, seed=seed)
+        gen_seconds = time.perf_counter() - start
+
+        try:
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                result = pool.submit(run_scale, str(data_dir), max_scatter_rows).result()
+        finally:
+            if not keep_data:
+                shutil.rmtree(data_dir, ignore_errors=True)
+
+        result.update(rows=rows, buildings=n_buildings, hours=n_hours,
+                      generate_seconds=round(gen_seconds, 4))
+        for name, stage in result["stages"].items():
+            print(f"{name:<36} {stage['seconds']:>10.3f}s  {stage['peak_rss_mb'] or 0:>9.1f} MB")
+        results.append(result)
+
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "seed": seed,
+            "bad_line_rate": bad_line_rate,
+        },
+        "results": results,
+        "reading_memory": measure_reading_memory(reading_memory) if reading_memory else None,
+    }
+
+
+def compare(current, baseline):
+    """Prints per-stage time ratios (current / baseline) for scales present in both."""
+    old = {r["rows"]: r["stages"] for r in baseline["results"]}
+    print("\n== comparison with baseline (ratio > 1 is slower) ==")
+    for result in current["results"]:
+        if result["rows"] not in old:
+            continue
+        print(f"{result['rows']:,} rows")
+        for name, stage in result["stages"].items():
+            before = old[result["rows"]].get(name)
+            if not before or not before["seconds"]:
+                continue
+            ratio = stage["seconds"] / before["seconds"]
+            print(f"  {name:<36} {before['seconds']:>9.3f}s -> {stage['seconds']:>9.3f}s  x{ratio:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the energy dashboard pipeline")
+    parser.add_argument("--scales", default="10k,1M",
+                        help="comma separated row counts, e.g. 10k,1M,50M")
+    parser.add_argument("--out", default="bench_results.json", help="JSON results file")
+    parser.add_argument("--compare", default=None, help="earlier results JSON to compare against")
+    parser.add_argument("--bad-line-rate", type=float, default=0.001,
+                        help="fraction of malformed lines in the generated CSVs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-scatter-rows", type=int, default=1_000_000,
+                        help="skip the full-scatter create_dashboard above this many rows")
+    parser.add_argument("--keep-data", default=None,
+                        help="write generated CSVs here and keep them instead of a temp dir")
+    parser.add_argument("--reading-memory", type=int, default=200_000,
+                        help="readings used to compare per-reading memory layouts (0 to skip)")
+    args = parser.parse_args(argv)
+
+    scales = [parse_scale(s) for s in args.scales.split(",") if s.strip()]
+    report = run_benchmarks(scales, args.max_scatter_rows, args.bad_line_rate, args.seed,
+                            args.keep_data, args.reading_memory)
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nresults saved to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
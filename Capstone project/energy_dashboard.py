@@ -1,27 +1,80 @@
+import argparse
+import hashlib
+import io
+import json
 import os
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
 from pathlib import Path
+import numpy as np
 import pandas as pd
+import matplotlib.image as mpimg
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
 
-def load_and_validate_data():
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M"
+
+
+def find_building_files(data_dir=None):
+    """Returns the building*.csv files in data_dir (default: next to this script)."""
+    data_dir = Path(data_dir) if data_dir else Path(__file__).parent
+    return sorted(f for f in data_dir.glob("*.csv")
+                  if f.stem.lower().startswith("building"))
+
+
+def _is_data_header(columns):
+    return columns is not None and 'timestamp' in columns and 'kwh' in columns
+
+
+def has_energy_columns(file):
+    """
+    True if the CSV header has timestamp and kwh columns, i.e. it is a
+    meter file and not an output such as building_summary.csv (which
+    also matches building*.csv). Unreadable files count as data so the
+    loaders still report them.
+    """
+    try:
+        return _is_data_header(pd.read_csv(file, nrows=0).columns)
+    except Exception:
+        return True
+
+
+def load_and_validate_data(data_dir=None, use_cache=True):
     """
     Loads ONLY building CSV files.
     Ignores any output files such as:
     - cleaned_energy_data.csv
     - building_summary.csv
+    If the columnar cache matches the current files it is used instead;
+    only files with timestamp/kwh columns are fingerprinted, so rewriting
+    building_summary.csv does not invalidate it.
     """
 
-    script_dir = Path(__file__).parent
-
-
-    csv_files = [f for f in script_dir.glob("*.csv")
-                 if f.stem.lower().startswith("building")]
+    csv_files = [f for f in find_building_files(data_dir) if has_energy_columns(f)]
 
     if not csv_files:
         print("No building*.csv files found next to this script.")
         return pd.DataFrame()
 
+    cache_dir = default_cache_dir(data_dir)
+    if use_cache:
+        cached = read_cache(cache_dir, csv_files)
+        if cached is not None:
+            return cached
+        fingerprints = [_fingerprint(f) for f in csv_files]
+
     combined_df = []
 
     for file in csv_files:
@@ -49,6 +102,204 @@ def load_and_validate_data():
 
     df_combined = pd.concat(combined_df, ignore_index=True)
     df_combined.sort_values("timestamp", inplace=True)
+
+    if use_cache:
+        write_cache(df_combined, fingerprints, cache_dir)
+    return df_combined
+
+
+CACHE_COLUMNS = ('timestamp', 'kwh', 'building')
+
+
+def default_cache_dir(data_dir=None):
+    data_dir = Path(data_dir) if data_dir else Path(__file__).parent
+    return data_dir / ".energy_cache"
+
+
+def _fingerprint(file):
+    stat = file.stat()
+    return {'path': str(file.resolve()), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _file_hash(path, block_size=1 << 20):
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def write_cache(df, fingerprints, cache_dir):
+    """
+    Writes the cleaned frame as one .npy file per column plus a
+    manifest with the size, mtime and content hash of every source file.
+    fingerprints must be taken before the files were read, so an append
+    during loading invalidates the cache on the next run.
+    """
+    if df.empty or set(df.columns) != set(CACHE_COLUMNS):
+        return
+
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(exist_ok=True)
+
+    buildings = pd.Categorical(df['building'])
+    np.save(cache_dir / "timestamp.npy", df['timestamp'].to_numpy())
+    np.save(cache_dir / "kwh.npy", df['kwh'].to_numpy())
+    np.save(cache_dir / "building.npy", buildings.codes)
+
+    sources = [dict(fp, hash=_file_hash(fp['path'])) for fp in fingerprints]
+    manifest = {'sources': sources, 'buildings': [str(c) for c in buildings.categories]}
+
+    # manifest last: a crash before this point leaves the old (now invalid) manifest
+    tmp = cache_dir / "manifest.json.tmp"
+    with tmp.open('w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, cache_dir / "manifest.json")
+
+
+def read_cache(cache_dir, csv_files):
+    """
+    Returns the cached frame, memory-mapped, if it was built from
+    exactly these files with unchanged content; otherwise None.
+    A file whose mtime changed but whose size and hash did not is
+    still accepted.
+    """
+    manifest_file = Path(cache_dir) / "manifest.json"
+    if not manifest_file.exists():
+        return None
+
+    try:
+        with manifest_file.open('r') as f:
+            manifest = json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return None
+
+    sources = {src['path']: src for src in manifest['sources']}
+    if set(sources) != {str(f.resolve()) for f in csv_files}:
+        return None
+
+    for file in csv_files:
+        src, now = sources[str(file.resolve())], _fingerprint(file)
+        if now['size'] != src['size']:
+            return None
+        if now['mtime_ns'] != src['mtime_ns'] and _file_hash(file) != src['hash']:
+            return None
+
+    try:
+        timestamps = np.load(Path(cache_dir) / "timestamp.npy", mmap_mode='r')
+        kwh = np.load(Path(cache_dir) / "kwh.npy", mmap_mode='r')
+        codes = np.load(Path(cache_dir) / "building.npy", mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+
+    return pd.DataFrame({
+        'timestamp': timestamps,
+        'kwh': kwh,
+        'building': pd.Categorical.from_codes(codes, manifest['buildings']),
+    }, copy=False)
+
+
+def _load_building_file(path, chunksize, timestamp_format):
+    """
+    Worker for load_and_validate_data_parallel: streams one CSV in
+    fixed-size chunks and returns it sorted by timestamp.
+    """
+    path = Path(path)
+    header = pd.read_csv(path, nrows=0)
+    if 'timestamp' not in header.columns or 'kwh' not in header.columns:
+        return None
+
+    def read(dtype):
+        return pd.read_csv(path, on_bad_lines='skip', chunksize=chunksize, dtype=dtype)
+
+    try:
+        chunks = list(_clean_chunks(read({'timestamp': str, 'kwh': np.float64}),
+                                    timestamp_format))
+    except ValueError:
+        # a non-numeric kwh value somewhere: fall back to coercing per chunk
+        chunks = list(_clean_chunks(read({'timestamp': str, 'kwh': str}),
+                                    timestamp_format))
+
+    if not chunks:
+        return None
+
+    df = pd.concat(chunks, ignore_index=True)
+    df['building'] = path.stem
+
+    if not df['timestamp'].is_monotonic_increasing:
+        df.sort_values("timestamp", inplace=True, kind="stable", ignore_index=True)
+    return df
+
+
+def _clean_chunks(reader, timestamp_format):
+    for chunk in reader:
+        chunk['timestamp'] = pd.to_datetime(chunk['timestamp'], format=timestamp_format,
+                                            errors='coerce')
+        if chunk['kwh'].dtype != np.float64:
+            chunk['kwh'] = pd.to_numeric(chunk['kwh'], errors='coerce')
+        chunk.dropna(subset=['timestamp', 'kwh'], inplace=True)
+        if not chunk.empty:
+            yield chunk
+
+
+def peak_memory_mb():
+    """Peak RSS of this process and of its largest child process, in MB."""
+    if resource is None:
+        return None, None
+    # ru_maxrss is in KB on Linux
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    return own, children
+
+
+def load_and_validate_data_parallel(data_dir=None, workers=None, chunksize=250_000,
+                                    timestamp_format=TIMESTAMP_FORMAT):
+    """
+    Same result as load_and_validate_data, for large fleets:
+    - files are parsed in a process pool
+    - each file is streamed in chunks with explicit dtypes and a
+      fixed timestamp format
+    - the per-file sorted results are combined with a stable sort, which
+      is fast on pre-sorted runs and keeps file order for equal timestamps
+    Prints rows/sec and peak memory so chunksize can be tuned.
+    """
+
+    csv_files = find_building_files(data_dir)
+
+    if not csv_files:
+        print("No building*.csv files found.")
+        return pd.DataFrame()
+
+    start = time.perf_counter()
+    frames = []
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {file: pool.submit(_load_building_file, file, chunksize, timestamp_format)
+                   for file in csv_files}
+        for file, future in futures.items():
+            try:
+                df = future.result()
+            except Exception as e:
+                print(f"Could not load {file.name}: {e}")
+                continue
+            if df is not None and not df.empty:
+                frames.append(df)
+
+    if not frames:
+        return pd.DataFrame()
+
+    df_combined = pd.concat(frames, ignore_index=True)
+    order = np.argsort(df_combined['timestamp'].to_numpy(), kind='stable')
+    df_combined = df_combined.take(order).reset_index(drop=True)
+
+    elapsed = time.perf_counter() - start
+    rows = len(df_combined)
+    own_mb, child_mb = peak_memory_mb()
+    print(f"Loaded {rows} rows from {len(frames)} files in {elapsed:.2f}s "
+          f"({rows / max(elapsed, 1e-9):,.0f} rows/sec)")
+    if own_mb is not None:
+        print(f"Peak memory: {own_mb:.1f} MB (main), {child_mb:.1f} MB (largest worker)")
+
     return df_combined
 
 
@@ -64,43 +315,453 @@ def building_wise_summary(df):
     return df.groupby("building")['kwh'].agg(['mean', 'min', 'max', 'sum'])
 
 
+class IncrementalAggregateStore:
+    """
+    Persistent daily/weekly/per-building aggregates.
+
+    For every building file the store remembers the byte offset it has
+    parsed up to, so a rerun only reads the rows appended since then and
+    merges them into the stored sums. Work per run is proportional to the
+    new rows, not to the full history.
+    """
+
+    def __init__(self, state_file="energy_state.json"):
+        self.state_file = Path(state_file)
+        self._reset()
+        self._load()
+
+    def _reset(self):
+        self.files = {}       # path -> {'offset', 'columns'}
+        self.daily = {}       # 'YYYY-MM-DD' -> kWh
+        self.weekly = {}      # week-ending Sunday 'YYYY-MM-DD' -> kWh
+        self.buildings = {}   # name -> {'count', 'sum', 'min', 'max'}
+        self.peak = None      # {'kwh', 'timestamp'}
+
+    def _load(self):
+        if not self.state_file.exists():
+            return
+        try:
+            with self.state_file.open('r') as f:
+                state = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"Could not read {self.state_file.name} ({e}), rebuilding aggregates")
+            return
+        self.files = state.get('files', {})
+        self.daily = state.get('daily', {})
+        self.weekly = state.get('weekly', {})
+        self.buildings = state.get('buildings', {})
+        self.peak = state.get('peak')
+
+    def save(self):
+        state = {'files': self.files, 'daily': self.daily, 'weekly': self.weekly,
+                 'buildings': self.buildings, 'peak': self.peak}
+        tmp = self.state_file.with_name(self.state_file.name + ".tmp")
+        with tmp.open('w') as f:
+            json.dump(state, f)
+        os.replace(tmp, self.state_file)
+
+    def update(self, data_dir=None):
+        """
+        Parses rows appended since the last run and merges them in.
+        Returns the number of new rows. If a file got shorter (rewritten
+        or truncated), or a final row counted without its newline was
+        later extended, the whole store is rebuilt. Files without
+        timestamp/kwh columns (our own outputs) are neither read nor
+        tracked.
+        """
+        csv_files = [f for f in find_building_files(data_dir) if has_energy_columns(f)]
+        self.files = {path: known for path, known in self.files.items()
+                      if _is_data_header(known.get('columns'))}
+
+        for file in csv_files:
+            known = self.files.get(str(file.resolve()))
+            if known and file.stat().st_size < known['offset']:
+                print(f"{file.name} was truncated, rebuilding aggregates")
+                self._reset()
+                break
+            if known and known.get('open_row') and not _row_was_final(file, known['offset']):
+                print(f"{file.name}: last row was still being written, rebuilding aggregates")
+                self._reset()
+                break
+
+        new_rows = 0
+        for file in csv_files:
+            try:
+                df = self._read_appended(file)
+            except Exception as e:
+                print(f"Could not load {file.name}: {e}")
+                continue
+            if df is not None and not df.empty:
+                self._merge(df)
+                new_rows += len(df)
+
+        return new_rows
+
+    def _read_appended(self, file):
+        key = str(file.resolve())
+        known = self.files.get(key, {'offset': 0, 'columns': None})
+        offset = known['offset']
+
+        with file.open('rb') as f:
+            f.seek(offset)
+            data = f.read()
+
+        if known.get('open_row'):
+            # the final row was counted last run; skip the newline it has gained since
+            skip = 2 if data.startswith(b"\r\n") else 1 if data[:1] in (b"\n", b"\r") else 0
+            data, offset = data[skip:], offset + skip
+
+        # complete lines are always consumed; an unterminated last row only
+        # if it parses fully (a finished file without a trailing newline)
+        end = data.rfind(b"\n") + 1
+        if end == 0 and offset == 0:
+            return None
+        rest = data[end:]
+        data = data[:end]
+
+        if offset == 0:
+            df = pd.read_csv(io.BytesIO(data), on_bad_lines='skip')
+        elif data:
+            df = pd.read_csv(io.BytesIO(data), header=None, names=known['columns'],
+                             on_bad_lines='skip')
+        else:
+            df = pd.DataFrame(columns=known['columns'])
+
+        if not _is_data_header(df.columns):
+            return None
+        last = _parse_final_row(rest, list(df.columns))
+        if last is not None:
+            df = pd.concat([df, last], ignore_index=True) if len(df) else last
+        self.files[key] = {'offset': offset + end + (len(rest) if last is not None else 0),
+                           'columns': list(df.columns), 'open_row': last is not None}
+
+        df['building'] = file.stem
+        df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
+        df['kwh'] = pd.to_numeric(df['kwh'], errors='coerce')
+        df.dropna(subset=['timestamp', 'kwh'], inplace=True)
+        return df
+
+    def _merge(self, df):
+        ts = df['timestamp']
+        _add_to(self.daily, df.groupby(ts.dt.normalize())['kwh'].sum())
+        week_end = ts.dt.to_period('W-SUN').dt.end_time.dt.normalize()
+        _add_to(self.weekly, df.groupby(week_end)['kwh'].sum())
+
+        for name, agg in df.groupby('building')['kwh'].agg(['count', 'sum', 'min', 'max']).iterrows():
+            b = self.buildings.get(name)
+            if b is None:
+                self.buildings[name] = {'count': int(agg['count']), 'sum': float(agg['sum']),
+                                        'min': float(agg['min']), 'max': float(agg['max'])}
+            else:
+                b['count'] += int(agg['count'])
+                b['sum'] += float(agg['sum'])
+                b['min'] = min(b['min'], float(agg['min']))
+                b['max'] = max(b['max'], float(agg['max']))
+
+        i = df['kwh'].idxmax()
+        if self.peak is None or df.at[i, 'kwh'] > self.peak['kwh']:
+            self.peak = {'kwh': float(df.at[i, 'kwh']), 'timestamp': str(df.at[i, 'timestamp'])}
+
+    def daily_totals(self):
+        """Same shape as calculate_daily_totals, gaps filled with 0."""
+        return _to_series(self.daily, "D")
+
+    def weekly_aggregates(self):
+        """Same shape as calculate_weekly_aggregates, gaps filled with 0."""
+        return _to_series(self.weekly, "W")
+
+    def building_summary(self):
+        """Same shape as building_wise_summary."""
+        summary = pd.DataFrame.from_dict(self.buildings, orient='index')
+        summary['mean'] = summary['sum'] / summary['count']
+        summary.index.name = 'building'
+        return summary[['mean', 'min', 'max', 'sum']].sort_index()
+
+
+def _add_to(totals, series):
+    for ts, value in series.items():
+        key = ts.strftime("%Y-%m-%d")
+        totals[key] = totals.get(key, 0.0) + float(value)
+
+
+def _parse_final_row(data, columns):
+    """The unterminated last row as a one-row frame, or None unless every field is there and valid."""
+    if not data.strip():
+        return None
+    try:
+        row = pd.read_csv(io.BytesIO(data), header=None, dtype=str)
+    except ValueError:   # includes pandas' ParserError / EmptyDataError
+        return None
+    if row.shape != (1, len(columns)):
+        return None
+    row.columns = columns
+    if (pd.isna(pd.to_datetime(row['timestamp'], errors='coerce')).any()
+            or pd.isna(pd.to_numeric(row['kwh'], errors='coerce')).any()):
+        return None
+    return row
+
+
+def _row_was_final(file, offset):
+    """True if the row counted up to offset without a newline has not been extended since."""
+    with file.open('rb') as f:
+        f.seek(offset)
+        head = f.read(2)
+    return head[:1] in (b"", b"\n") or head in (b"\r", b"\r\n")
+
+
+def _to_series(totals, freq):
+    series = pd.Series(totals, dtype=np.float64)
+    series.index = pd.to_datetime(series.index)
+    series = series.sort_index()
+    if not series.empty:
+        series = series.reindex(pd.date_range(series.index[0], series.index[-1], freq=freq),
+                                fill_value=0.0)
+    series.index.name = 'timestamp'
+    series.name = 'kwh'
+    return series
+
+
 class MeterReading:
+    __slots__ = ('timestamp', 'kwh')
+
     def __init__(self, timestamp, kwh):
         self.timestamp = timestamp
         self.kwh = kwh
 
+
+class _MeterReadingView:
+    """
+    Read-only sequence of MeterReading objects over a building's
+    columnar arrays. Objects are only built when an item is accessed.
+    """
+    __slots__ = ('_building',)
+
+    def __init__(self, building):
+        self._building = building
+
+    def __len__(self):
+        return len(self._building)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return MeterReading(pd.Timestamp(self._building.timestamps[i]),
+                            self._building.kwh[i])
+
+    def __iter__(self):
+        timestamps, kwh = self._building.timestamps, self._building.kwh
+        for ts, value in zip(timestamps, kwh):
+            yield MeterReading(pd.Timestamp(ts), value)
+
+
+def _to_epoch_ns(timestamp):
+    if isinstance(timestamp, np.datetime64):
+        return int(timestamp.astype("datetime64[ns]").astype(np.int64))
+    return pd.Timestamp(timestamp).value
+
+
 class Building:
-    def __init__(self, name):
+    """
+    Readings live in two growable buffers: int64 epoch nanoseconds and
+    kWh (float64 by default, float32 to halve that column). Capacity
+    doubles when full, so add_reading is amortized O(1) and creates no
+    per-reading objects.
+    """
+    __slots__ = ('name', '_ts', '_kwh', '_size')
+
+    def __init__(self, name, kwh_dtype=np.float64, capacity=16):
         self.name = name
-        self.meter_readings = []
+        self._ts = np.empty(capacity, dtype=np.int64)
+        self._kwh = np.empty(capacity, dtype=kwh_dtype)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        if needed <= len(self._ts):
+            return
+        capacity = max(needed, 2 * len(self._ts))
+        ts, kwh = np.empty(capacity, dtype=np.int64), np.empty(capacity, dtype=self._kwh.dtype)
+        ts[:self._size] = self._ts[:self._size]
+        kwh[:self._size] = self._kwh[:self._size]
+        self._ts, self._kwh = ts, kwh
 
     def add_reading(self, timestamp, kwh):
-        self.meter_readings.append(MeterReading(timestamp, kwh))
+        self._reserve(1)
+        self._ts[self._size] = _to_epoch_ns(timestamp)
+        self._kwh[self._size] = kwh
+        self._size += 1
+
+    def extend_readings(self, timestamps, kwh):
+        """Appends whole arrays of readings at once."""
+        timestamps = np.asarray(timestamps, dtype="datetime64[ns]").view(np.int64)
+        n = len(timestamps)
+        self._reserve(n)
+        self._ts[self._size:self._size + n] = timestamps
+        self._kwh[self._size:self._size + n] = kwh
+        self._size += n
+
+    @property
+    def timestamps(self):
+        return self._ts[:self._size].view("datetime64[ns]")
+
+    @property
+    def kwh(self):
+        return self._kwh[:self._size]
+
+    @property
+    def nbytes(self):
+        """Bytes held by the reading buffers (including spare capacity)."""
+        return self._ts.nbytes + self._kwh.nbytes
+
+    @property
+    def meter_readings(self):
+        return _MeterReadingView(self)
 
     def calculate_total_consumption(self):
-        return sum(r.kwh for r in self.meter_readings)
+        return float(self.kwh.sum(dtype=np.float64))
 
     def generate_report(self):
         return f"{self.name}: Total = {self.calculate_total_consumption():.2f} kWh"
 
 class BuildingManager:
-    def __init__(self):
+    def __init__(self, kwh_dtype=np.float64):
         self.buildings = {}
+        self.store = None
+        self.kwh_dtype = kwh_dtype
 
     def ingest_dataframe(self, df):
-        for _, row in df.iterrows():
-            name = row['building']
-            ts = row['timestamp']
-            kwh = row['kwh']
+        """
+        Columnar ingest: one groupby over the combined frame, each
+        building receives contiguous timestamp and kWh arrays.
+        """
+        if df.empty:
+            return
 
+        timestamps = df['timestamp'].to_numpy(dtype="datetime64[ns]")
+        kwh = df['kwh'].to_numpy(dtype=self.kwh_dtype)
+
+        for name, idx in df.groupby('building', sort=False).indices.items():
             if name not in self.buildings:
-                self.buildings[name] = Building(name)
+                self.buildings[name] = Building(name, self.kwh_dtype, capacity=len(idx))
 
-            self.buildings[name].add_reading(ts, kwh)
+            self.buildings[name].extend_readings(timestamps[idx], kwh[idx])
 
     def generate_all_reports(self):
         return [b.generate_report() for b in self.buildings.values()]
 
+    def write_partitions(self, root):
+        """Writes every building to a PartitionedStore at root and attaches it."""
+        store = PartitionedStore(root)
+        for b in self.buildings.values():
+            store.write_building(b.name, b.timestamps, b.kwh)
+        store.save_index()
+        self.store = store
+        return store
+
+    def open_partitions(self, root):
+        self.store = PartitionedStore(root)
+        return self.store
+
+    def query(self, building, start, end, freq=None):
+        """
+        Readings of `building` with start <= timestamp < end, optionally
+        resampled (e.g. freq='h'). Served from the attached partition
+        store if there is one, otherwise from the in-memory arrays.
+        """
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        if self.store is not None:
+            timestamps, kwh = self.store.read(building, start, end)
+        else:
+            b = self.buildings.get(building)
+            if b is None:
+                timestamps, kwh = np.empty(0, dtype="datetime64[ns]"), np.empty(0)
+            else:
+                order = np.argsort(b.timestamps, kind='stable')
+                ts_sorted = b.timestamps[order]
+                lo, hi = np.searchsorted(ts_sorted, [start.to_datetime64(), end.to_datetime64()])
+                timestamps, kwh = ts_sorted[lo:hi], b.kwh[order][lo:hi]
+
+        result = pd.Series(kwh, index=pd.DatetimeIndex(timestamps, name='timestamp'), name='kwh')
+        if freq:
+            result = result.resample(freq).sum()
+        return result
+
+
+PARTITION_DTYPE = np.dtype([('timestamp', 'datetime64[ns]'), ('kwh', np.float64)])
+
+
+class PartitionedStore:
+    """
+    On-disk readings, one sorted .npy partition per building per month:
+
+        root/index.json
+        root/<building>/<YYYY-MM>.npy
+
+    index.json keeps each partition's row count and min/max timestamp,
+    so a range query opens only the partitions that overlap the range
+    and slices them with searchsorted on a memory-mapped array.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.index = {}   # building -> {'YYYY-MM': {'min', 'max', 'rows'}}
+        index_file = self.root / "index.json"
+        if index_file.exists():
+            with index_file.open('r') as f:
+                self.index = json.load(f)
+
+    def write_building(self, name, timestamps, kwh):
+        """Replaces all partitions of one building with the given readings."""
+        timestamps = np.asarray(timestamps, dtype="datetime64[ns]")
+        order = np.argsort(timestamps, kind='stable')
+        timestamps, kwh = timestamps[order], np.asarray(kwh, dtype=np.float64)[order]
+
+        folder = self.root / name
+        folder.mkdir(parents=True, exist_ok=True)
+        for old in folder.glob("*.npy"):
+            old.unlink()
+
+        months = timestamps.astype("datetime64[M]")
+        bounds = np.flatnonzero(np.r_[True, months[1:] != months[:-1], True])
+        partitions = {}
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            part = np.empty(hi - lo, dtype=PARTITION_DTYPE)
+            part['timestamp'] = timestamps[lo:hi]
+            part['kwh'] = kwh[lo:hi]
+            month = str(months[lo])
+            np.save(folder / f"{month}.npy", part)
+            partitions[month] = {'min': str(timestamps[lo]), 'max': str(timestamps[hi - 1]),
+                                 'rows': int(hi - lo)}
+        self.index[name] = partitions
+
+    def save_index(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / "index.json.tmp"
+        with tmp.open('w') as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(tmp, self.root / "index.json")
+
+    def read(self, building, start, end):
+        """Returns (timestamps, kwh) arrays for start <= timestamp < end."""
+        start = np.datetime64(pd.Timestamp(start), 'ns')
+        end = np.datetime64(pd.Timestamp(end), 'ns')
+
+        ts_parts, kwh_parts = [], []
+        for month, meta in sorted(self.index.get(building, {}).items()):
+            if np.datetime64(meta['max'], 'ns') < start or np.datetime64(meta['min'], 'ns') >= end:
+                continue
+            part = np.load(self.root / building / f"{month}.npy", mmap_mode='r')
+            lo, hi = np.searchsorted(part['timestamp'], [start, end])
+            ts_parts.append(part['timestamp'][lo:hi])
+            kwh_parts.append(part['kwh'][lo:hi])
+
+        if not ts_parts:
+            return np.empty(0, dtype="datetime64[ns]"), np.empty(0, dtype=np.float64)
+        return np.concatenate(ts_parts), np.concatenate(kwh_parts)
+
 
 def create_dashboard(df, daily, weekly, summary):
     fig, ax = plt.subplots(3, 1, figsize=(12, 16))
@@ -129,17 +790,101 @@ def create_dashboard(df, daily, weekly, summary):
     print("✔ dashboard.png saved")
 
 
-def generate_summary_report(df, summary):
+def _hourly_profile(df, kwh_bins=60):
+    """
+    Pre-aggregates every reading into a 24 x kwh_bins density grid and
+    per-hour percentiles, without adding columns to df.
+    """
+    hours = df['timestamp'].dt.hour.to_numpy()
+    kwh = df['kwh'].to_numpy(dtype=np.float64)
+
+    lo, hi = kwh.min(), kwh.max()
+    density, _, kwh_edges = np.histogram2d(hours, kwh, bins=(24, kwh_bins),
+                                           range=((-0.5, 23.5), (lo, hi if hi > lo else lo + 1)))
+    stats = pd.Series(kwh).groupby(hours).quantile([0.5, 0.95, 1.0]).unstack()
+    stats = stats.reindex(range(24))
+    return density, kwh_edges, stats
+
+
+def _draw_daily_panel(ax, daily):
+    ax.plot(daily.index, daily.values)
+    ax.set_title("Daily Consumption Trend")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("kWh")
+
+
+def _draw_building_panel(ax, summary):
+    ax.bar(summary.index.astype(str), summary['mean'].values)
+    ax.set_title("Avg Weekly Usage per Building")
+    ax.set_ylabel("kWh")
+
+
+def _draw_hourly_panel(ax, density, kwh_edges, stats):
+    ax.imshow(density.T, origin='lower', aspect='auto', cmap='Blues',
+              extent=(-0.5, 23.5, kwh_edges[0], kwh_edges[-1]))
+    ax.plot(stats.index, stats[0.5], color='tab:orange', label='median')
+    ax.plot(stats.index, stats[0.95], color='tab:red', label='p95')
+    ax.plot(stats.index, stats[1.0], color='black', linestyle='--', label='max')
+    ax.legend(loc='upper right')
+    ax.set_title("Hourly Peak Consumption")
+    ax.set_xlabel("Hour")
+    ax.set_ylabel("kWh")
+
+
+def _render_panel(draw, args, figsize, dpi):
+    """
+    Draws one panel on its own Agg canvas and returns the RGBA pixels.
+    Module level so it can run in a worker process.
+    """
+    fig = Figure(figsize=figsize, dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    draw(fig.add_subplot(), *args)
+    fig.tight_layout()
+    canvas.draw()
+    return np.asarray(canvas.buffer_rgba()).copy()
+
+
+def create_dashboard_fast(df, daily, weekly, summary, path="dashboard.png", dpi=100, workers=None):
+    """
+    Same three panels as create_dashboard, but drawing cost depends on
+    the number of bins, not rows:
+    - the hourly panel is a density grid with p50/p95/max lines
+      instead of a scatter of every reading
+    - per-building averages come from `summary`
+    - df is not modified
+    Each panel is rendered on its own Agg canvas in a process pool
+    (Agg drawing holds the GIL, so threads would run one at a time);
+    only the small aggregates go to the workers and RGBA arrays come
+    back to be stacked into one image.
+    """
+    density, kwh_edges, stats = _hourly_profile(df)
+
+    panels = [(_draw_daily_panel, (daily,)),
+              (_draw_building_panel, (summary,)),
+              (_draw_hourly_panel, (density, kwh_edges, stats))]
+    with ProcessPoolExecutor(max_workers=min(workers or len(panels), len(panels))) as pool:
+        futures = [pool.submit(_render_panel, draw, args, (12, 16 / 3), dpi) for draw, args in panels]
+        images = [future.result() for future in futures]
+
+    mpimg.imsave(path, np.vstack(images))
+    print(f"✔ {path} saved")
+
+
+def generate_summary_report(df, summary, extra=""):
     total = df['kwh'].sum()
     highest = summary['sum'].idxmax()
     peak_time = df.loc[df['kwh'].idxmax(), 'timestamp']
 
+    write_summary_report(total, highest, peak_time, extra)
+
+
+def write_summary_report(total, highest, peak_time, extra=""):
     text = (
         "=== ENERGY SUMMARY REPORT ===\n"
         f"Total Consumption: {total:.2f} kWh\n"
         f"Highest Consuming Building: {highest}\n"
         f"Peak Load Time: {peak_time}\n"
-    )
+    ) + extra
 
     with open("summary.txt", "w") as f:
         f.write(text)
@@ -148,10 +893,465 @@ def generate_summary_report(df, summary):
     print(text)
 
 
-def main():
+def detect_anomalies(df, window=24, z_threshold=3.0, ewm_span=24, top_k=5,
+                     overload_quantile=0.95, min_overload=3):
+    """
+    Per-building peak and anomaly detection over the loaded readings.
+
+    - baseline: rolling mean/std of the previous `window` readings
+      (cumulative sums with per-building resets, no Python loop over
+      rows) plus an EWMA of the previous readings
+    - anomalies: readings whose rolling z-score is >= z_threshold
+    - peaks: top_k readings per building via argpartition, not a sort
+    - overloads: runs of >= min_overload consecutive readings above the
+      building's overload_quantile
+
+    Returns a dict of DataFrames: 'peaks', 'anomalies', 'overloads'.
+    """
+    codes, names = pd.factorize(df['building'], sort=True)
+    order = np.lexsort((df['timestamp'].to_numpy(), codes))
+    codes = codes[order]
+    timestamps = df['timestamp'].to_numpy()[order]
+    kwh = df['kwh'].to_numpy(dtype=np.float64)[order]
+    series = pd.Series(kwh)
+    n = len(kwh)
+
+    # first row of each building's block, broadcast to every row
+    bounds = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1], True])
+    group_start = np.repeat(bounds[:-1], np.diff(bounds))
+
+    # center per building so the running sums of squares stay accurate
+    means = np.bincount(codes, weights=kwh) / np.bincount(codes)
+    x = kwh - means[codes]
+    cs = np.r_[0.0, np.cumsum(x)]
+    cs2 = np.r_[0.0, np.cumsum(x * x)]
+
+    i = np.arange(n)
+    lo = np.maximum(i - window, group_start)
+    count = i - lo
+    with np.errstate(invalid='ignore', divide='ignore'):
+        roll_mean = (cs[i] - cs[lo]) / count
+        roll_var = (cs2[i] - cs2[lo]) / count - roll_mean ** 2
+        roll_std = np.sqrt(np.maximum(roll_var * count / (count - 1), 0.0))
+        z = (x - roll_mean) / roll_std
+    z[(count < max(2, window // 2)) | ~np.isfinite(z)] = 0.0
+
+    ewma = series.groupby(codes, sort=False).ewm(span=ewm_span).mean()
+    ewma = ewma.reset_index(level=0, drop=True).sort_index()
+    ewma = ewma.groupby(codes, sort=False).shift(1).to_numpy()
+
+    flagged = np.flatnonzero(np.abs(z) >= z_threshold)
+    anomalies = pd.DataFrame({
+        'building': names[codes[flagged]],
+        'timestamp': timestamps[flagged],
+        'kwh': kwh[flagged],
+        'baseline': roll_mean[flagged] + means[codes[flagged]],
+        'ewma': ewma[flagged],
+        'zscore': z[flagged],
+    })
+
+    peak_rows = []
+    for lo_b, hi_b in zip(bounds[:-1], bounds[1:]):
+        k = min(top_k, hi_b - lo_b)
+        part = np.argpartition(kwh[lo_b:hi_b], -k)[-k:]
+        part = part[np.argsort(kwh[lo_b:hi_b][part])[::-1]]
+        peak_rows.append(lo_b + part)
+    peak_rows = np.concatenate(peak_rows) if peak_rows else np.arange(0)
+    peaks = pd.DataFrame({'building': names[codes[peak_rows]],
+                          'timestamp': timestamps[peak_rows],
+                          'kwh': kwh[peak_rows]})
+
+    thresholds = series.groupby(codes).quantile(overload_quantile).to_numpy()
+    over = kwh > thresholds[codes]
+    run_start = over & ~np.r_[False, over[:-1] & (codes[1:] == codes[:-1])]
+    run_id = np.cumsum(run_start)[over]
+    over_rows = pd.DataFrame({'building': names[codes[over]],
+                              'timestamp': timestamps[over],
+                              'kwh': kwh[over]})
+    runs = over_rows.groupby(run_id).agg(building=('building', 'first'),
+                                          start=('timestamp', 'first'),
+                                          end=('timestamp', 'last'),
+                                          readings=('kwh', 'size'),
+                                          peak_kwh=('kwh', 'max'),
+                                          total_kwh=('kwh', 'sum'))
+    overloads = runs[runs['readings'] >= min_overload].reset_index(drop=True)
+
+    return {'peaks': peaks, 'anomalies': anomalies, 'overloads': overloads}
+
+
+def format_anomaly_report(results, max_buildings=20):
+    """Text section for summary.txt; the full detail goes to the JSON file."""
+    peaks, anomalies, overloads = results['peaks'], results['anomalies'], results['overloads']
+    top = peaks.loc[peaks.groupby('building')['kwh'].idxmax()].sort_values('kwh', ascending=False)
+    n_anomalies = anomalies.groupby('building').size()
+    n_overloads = overloads.groupby('building').size()
+
+    lines = ["\n=== PEAKS & ANOMALIES ===",
+             f"Anomalous readings: {len(anomalies)}",
+             f"Sustained overload intervals: {len(overloads)}"]
+    for _, row in top.head(max_buildings).iterrows():
+        name = row['building']
+        lines.append(f"{name}: peak {row['kwh']:.2f} kWh at {row['timestamp']}, "
+                     f"{n_anomalies.get(name, 0)} anomalies, "
+                     f"{n_overloads.get(name, 0)} overload intervals")
+    if len(top) > max_buildings:
+        lines.append(f"... {len(top) - max_buildings} more buildings in the JSON report")
+    return "\n".join(lines) + "\n"
+
+
+def write_anomaly_json(results, path="anomalies.json"):
+    report = {}
+    for key, frame in results.items():
+        for name, rows in frame.groupby('building', sort=False):
+            rows = rows.drop(columns='building')
+            report.setdefault(str(name), {})[key] = json.loads(
+                rows.to_json(orient='records', date_format='iso'))
+
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"{path} saved")
+
+
+class RollingWindow:
+    """
+    Sum of the readings within `span` of the newest one.
+    Each reading is appended and evicted once, so updates are O(1)
+    amortized and memory is bounded by the readings inside the span.
+    """
+
+    def __init__(self, span):
+        self.span = span
+        self.readings = deque()
+        self.total = 0.0
+
+    def add(self, ts, kwh):
+        self.readings.append((ts, kwh))
+        self.total += kwh
+        cutoff = ts - self.span
+        while self.readings and self.readings[0][0] <= cutoff:
+            self.total -= self.readings.popleft()[1]
+
+
+class BuildingStream:
+    """Running figures for one building in streaming mode."""
+
+    def __init__(self, name):
+        self.name = name
+        self.last_24h = RollingWindow(timedelta(hours=24))
+        self.last_7d = RollingWindow(timedelta(days=7))
+        self.hours = deque()   # [hour_start, kWh] for the last 24 hours
+        self.count = 0
+        self.sum = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+
+    def add(self, ts, kwh):
+        self.last_24h.add(ts, kwh)
+        self.last_7d.add(ts, kwh)
+
+        hour = ts.replace(minute=0, second=0, microsecond=0)
+        if self.hours and self.hours[-1][0] == hour:
+            self.hours[-1][1] += kwh
+        else:
+            self.hours.append([hour, kwh])
+            while self.hours[0][0] <= hour - timedelta(hours=24):
+                self.hours.popleft()
+
+        self.count += 1
+        self.sum += kwh
+        self.min = min(self.min, kwh)
+        self.max = max(self.max, kwh)
+
+    def peak_hour(self):
+        """Busiest hour of the last 24h (at most 24 buckets)."""
+        if not self.hours:
+            return None, 0.0
+        hour, kwh = max(self.hours, key=lambda h: h[1])
+        return hour, kwh
+
+
+class LiveDashboard:
+    """
+    Streaming counterpart of the batch pipeline: every reading updates
+    daily, weekly and per-building figures in O(1). Daily and weekly
+    totals keep only the most recent days/weeks so memory stays bounded.
+    """
+
+    def __init__(self, keep_days=31, keep_weeks=12):
+        self.buildings = {}
+        self.daily = OrderedDict()
+        self.weekly = OrderedDict()
+        self.keep_days = keep_days
+        self.keep_weeks = keep_weeks
+        self.readings = 0
+
+    def add_reading(self, building, ts, kwh):
+        if building not in self.buildings:
+            self.buildings[building] = BuildingStream(building)
+        self.buildings[building].add(ts, kwh)
+
+        day = ts.date()
+        _add_bounded(self.daily, day.isoformat(), kwh, self.keep_days)
+        week_end = day + timedelta(days=6 - day.weekday())
+        _add_bounded(self.weekly, week_end.isoformat(), kwh, self.keep_weeks)
+        self.readings += 1
+
+    def snapshot(self):
+        buildings = {}
+        for name, b in self.buildings.items():
+            peak_hour, peak_kwh = b.peak_hour()
+            buildings[name] = {
+                'last_24h_kwh': b.last_24h.total,
+                'last_7d_kwh': b.last_7d.total,
+                'peak_hour': peak_hour.isoformat() if peak_hour else None,
+                'peak_hour_kwh': peak_kwh,
+                'count': b.count,
+                'mean': b.sum / b.count,
+                'min': b.min,
+                'max': b.max,
+                'sum': b.sum,
+            }
+        return {
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'readings': self.readings,
+            'daily': dict(self.daily),
+            'weekly': dict(self.weekly),
+            'buildings': buildings,
+        }
+
+    def write_snapshot(self, path):
+        tmp = Path(str(path) + ".tmp")
+        with tmp.open('w') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp, path)
+
+    def render(self, path):
+        """Small live dashboard: recent daily totals and last-24h usage per building."""
+        fig, ax = plt.subplots(2, 1, figsize=(12, 8))
+
+        days = pd.to_datetime(list(self.daily.keys()))
+        ax[0].plot(days, list(self.daily.values()))
+        ax[0].set_title("Daily Consumption Trend (live)")
+        ax[0].set_ylabel("kWh")
+
+        names = list(self.buildings)
+        ax[1].bar(names, [self.buildings[n].last_24h.total for n in names])
+        ax[1].set_title("Last 24h Usage per Building")
+        ax[1].set_ylabel("kWh")
+
+        fig.tight_layout()
+        fig.savefig(path)
+        plt.close(fig)
+
+
+def _add_bounded(totals, key, kwh, keep):
+    """
+    Add kwh to the ISO-date bucket `key`, keeping `totals` in date order
+    with only the newest `keep` dates. Buildings can be fed one after
+    another, so a new key may be older than existing ones.
+    """
+    if key in totals:
+        totals[key] += kwh
+        return
+    newest = next(reversed(totals), None)
+    totals[key] = kwh
+    if newest is not None and key < newest:
+        for k in sorted(totals):
+            totals.move_to_end(k)
+    while len(totals) > keep:
+        totals.popitem(last=False)
+
+
+def _parse_reading(building, ts_text, kwh_text):
+    try:
+        return building, datetime.fromisoformat(ts_text.strip()), float(kwh_text)
+    except ValueError:
+        return None
+
+
+def tail_building_files(out, data_dir=None, poll=1.0, stop=None):
+    """
+    Producer for streaming mode: follows every building*.csv like
+    `tail -f` and puts (building, timestamp, kwh) tuples on `out`.
+    Only complete lines are consumed.
+    """
+    offsets, columns = {}, {}
+    while stop is None or not stop.is_set():
+        for file in find_building_files(data_dir):
+            offset = offsets.get(file, 0)
+            if file.stat().st_size < offset:
+                offset = 0
+                columns.pop(file, None)
+            with file.open('rb') as f:
+                f.seek(offset)
+                data = f.read()
+            end = data.rfind(b"\n") + 1
+            if end == 0:
+                continue
+            offsets[file] = offset + end
+
+            lines = data[:end].decode('utf-8', errors='replace').splitlines()
+            if file not in columns:
+                header = [c.strip() for c in lines.pop(0).split(',')] if lines else []
+                if 'timestamp' not in header or 'kwh' not in header:
+                    continue
+                columns[file] = (header.index('timestamp'), header.index('kwh'))
+
+            ts_col, kwh_col = columns[file]
+            for line in lines:
+                fields = line.split(',')
+                if len(fields) <= max(ts_col, kwh_col):
+                    continue
+                reading = _parse_reading(file.stem, fields[ts_col], fields[kwh_col])
+                if reading:
+                    out.put(reading)
+        time.sleep(poll)
+
+
+def read_stdin_readings(out, stream=None):
+    """
+    Producer for streaming mode: reads `building,timestamp,kwh` lines
+    from stdin and puts None on `out` at end of input.
+    """
+    for line in stream or sys.stdin:
+        fields = line.strip().split(',')
+        if len(fields) != 3:
+            continue
+        reading = _parse_reading(*fields)
+        if reading:
+            out.put(reading)
+    out.put(None)
+
+
+def run_streaming(args):
+    """
+    Long-running mode: readings flow from a producer thread through a
+    bounded queue; the snapshot (and optionally the dashboard image) is
+    refreshed every `interval` seconds whether or not data arrives.
+    """
+    live = LiveDashboard()
+    readings = queue.Queue(maxsize=100_000)
+
+    if args.stream == 'stdin':
+        producer = threading.Thread(target=read_stdin_readings, args=(readings,), daemon=True)
+    else:
+        producer = threading.Thread(target=tail_building_files,
+                                    args=(readings, args.data_dir, args.poll), daemon=True)
+    producer.start()
+    print(f"Streaming from {args.stream}, snapshot every {args.interval}s to {args.snapshot}")
+
+    next_refresh = time.monotonic() + args.interval
+    done = False
+    try:
+        while not done:
+            try:
+                item = readings.get(timeout=max(0.0, next_refresh - time.monotonic()))
+                if item is None:
+                    done = True
+                else:
+                    live.add_reading(*item)
+            except queue.Empty:
+                pass
+
+            if done or time.monotonic() >= next_refresh:
+                live.write_snapshot(args.snapshot)
+                if args.stream_png:
+                    live.render(args.stream_png)
+                next_refresh = time.monotonic() + args.interval
+    except KeyboardInterrupt:
+        live.write_snapshot(args.snapshot)
+
+    print(f"Stopped after {live.readings} readings, last snapshot in {args.snapshot}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Campus energy dashboard")
+    parser.add_argument("--data-dir", default=None,
+                        help="folder with building*.csv files (default: next to this script)")
+    parser.add_argument("--parallel", action="store_true",
+                        help="parse files in a process pool, streaming each in chunks")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes for --parallel (default: CPU count) and --fast-dashboard")
+    parser.add_argument("--chunksize", type=int, default=250_000,
+                        help="rows per chunk for --parallel")
+    parser.add_argument("--store", default=None,
+                        help="time-partitioned reading store (one file per building per month); "
+                             "written after ingest, read by --query")
+    parser.add_argument("--query", nargs=3, metavar=("BUILDING", "START", "END"), default=None,
+                        help="print readings of one building in [START, END) from --store and exit")
+    parser.add_argument("--freq", default=None,
+                        help="resample --query results, e.g. h or D")
+    parser.add_argument("--fast-dashboard", action="store_true",
+                        help="draw pre-aggregated panels in parallel instead of plotting every reading")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="ignore and do not write the columnar cache of cleaned data")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only parse rows appended since the last run and update stored aggregates")
+    parser.add_argument("--state", default="energy_state.json",
+                        help="aggregate store used by --incremental")
+    parser.add_argument("--stream", choices=['files', 'stdin'], default=None,
+                        help="live mode: tail building*.csv files or read building,timestamp,kwh lines from stdin")
+    parser.add_argument("--interval", type=float, default=10.0,
+                        help="seconds between snapshot refreshes in --stream mode")
+    parser.add_argument("--poll", type=float, default=1.0,
+                        help="seconds between file checks for --stream files")
+    parser.add_argument("--snapshot", default="live_snapshot.json",
+                        help="JSON snapshot written by --stream")
+    parser.add_argument("--stream-png", default=None,
+                        help="also refresh this dashboard image in --stream mode")
+    return parser.parse_args(argv)
+
+
+def run_incremental(args):
+    store = IncrementalAggregateStore(args.state)
+    new_rows = store.update(args.data_dir)
+    store.save()
+    print(f"{new_rows} new rows merged into {args.state}")
+
+    if not store.buildings:
+        print("No valid CSVs found. Exiting.")
+        return
+
+    summary = store.building_summary()
+    store.daily_totals().to_csv("daily_totals.csv")
+    store.weekly_aggregates().to_csv("weekly_aggregates.csv")
+    summary.to_csv("building_summary.csv")
+
+    print("daily_totals.csv saved")
+    print("weekly_aggregates.csv saved")
+    print("building_summary.csv saved")
+
+    write_summary_report(summary['sum'].sum(), summary['sum'].idxmax(),
+                         pd.Timestamp(store.peak['timestamp']))
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.query:
+        if not args.store:
+            print("--query needs --store")
+            return
+        manager = BuildingManager()
+        manager.open_partitions(args.store)
+        print(manager.query(*args.query, freq=args.freq).to_string())
+        return
+
+    if args.stream:
+        run_streaming(args)
+        return
+
+    if args.incremental:
+        run_incremental(args)
+        return
+
     print("Loading CSV files from this folder...")
 
-    df = load_and_validate_data()
+    if args.parallel:
+        df = load_and_validate_data_parallel(args.data_dir, workers=args.workers,
+                                             chunksize=args.chunksize)
+    else:
+        df = load_and_validate_data(args.data_dir, use_cache=not args.no_cache)
 
     if df.empty:
         print("No valid CSVs found. Exiting.")
@@ -163,8 +1363,14 @@ def main():
 
     manager = BuildingManager()
     manager.ingest_dataframe(df)
+    if args.store:
+        manager.write_partitions(args.store)
+        print(f"partitions written to {args.store}")
 
-    create_dashboard(df, daily, weekly, summary)
+    if args.fast_dashboard:
+        create_dashboard_fast(df, daily, weekly, summary, workers=args.workers)
+    else:
+        create_dashboard(df, daily, weekly, summary)
 
     df.to_csv("cleaned_energy_data.csv", index=False)
     summary.to_csv("building_summary.csv")
@@ -172,7 +1378,9 @@ def main():
     print("cleaned_energy_data.csv saved")
     print("building_summary.csv saved")
 
-    generate_summary_report(df, summary)
+    anomalies = detect_anomalies(df)
+    write_anomaly_json(anomalies)
+    generate_summary_report(df, summary, format_anomaly_report(anomalies))
 
     print("\nAll tasks completed successfully.")
 